@@ -0,0 +1,235 @@
+"""Game analytics
+
+Turns-to-win distributions and winner position bias per level and bot count, for
+balancing levels. Results of any number of simulated games are kept as flat NumPy
+arrays (one entry per game) and summarised without a Python loop per game: every
+(level, bots) group gets a histogram of the turns its games took, quantiles read off
+that histogram, and the share of games won from each seat.
+
+    python -m packs.analytics --levels 1 2 3 --bots 1 2 4 --games 2000 --workers 4
+
+Summaries are written as JSON, a CSV row per group and a long-format histogram CSV
+into GameConfig.LogPath (project:///logs/)."""
+
+import csv
+import json
+import os
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from time import perf_counter, strftime
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+from .config import GameConfig
+from .game import BaseGame
+from .game.zeroplayer import ZeroPlayer
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Results(NamedTuple):
+    """One entry per game. winner is the seat of the first winner, -1 when nobody won."""
+    level: np.ndarray
+    bots: np.ndarray
+    turns: np.ndarray
+    winner: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: Iterable[tuple[int, int, int, int]]) -> 'Results':
+        """Results from (level, bots, turns, winner) records"""
+        table = np.array(list(records), dtype=np.int64).reshape(-1, 4)
+        return cls(*(table[:, column] for column in range(4)))
+
+    @classmethod
+    def concatenate(cls, parts: Iterable['Results']) -> 'Results':
+        parts = list(parts)
+        if not parts:
+            return cls.from_records(())
+        return cls(*(np.concatenate(column) for column in zip(*parts)))
+
+    def save(self, path: str):
+        np.savez_compressed(path, **self._asdict())
+
+    @classmethod
+    def load(cls, path: str) -> 'Results':
+        with np.load(path) as data:
+            return cls(*(data[field] for field in cls._fields))
+
+    @property
+    def Games(self):
+        # Not __len__: a NamedTuple's length is its field count
+        return self.turns.size
+
+
+def simulate(level: int, bots: int, games: int, seed: int | None = None) -> Results:
+    """Play headless ZeroPlayer games (game i seeded with seed + i)"""
+    turns = np.empty(games, dtype=np.int64)
+    winner = np.empty(games, dtype=np.int64)
+    for index in range(games):
+        game = ZeroPlayer(bots, level, delay=0, stream=None)
+        game.set_seed(None if seed is None else seed + index)
+        game.run()
+        players = game._players
+        turns[index] = game._turn
+        winner[index] = players.index(
+            game._winner[0]) if game._winner else -1
+    return Results(np.full(games, level), np.full(games, max(bots, 1)), turns, winner)
+
+
+def _simulate(task: tuple[int, int, int, int | None]) -> Results:
+    return simulate(*task)
+
+
+def simulate_many(levels: Iterable[int], bots: Iterable[int], games: int, seed: int | None = None,
+                  workers: int | None = None, chunk: int = 500) -> Results:
+    """simulate() every (level, bots) pair, split into chunks over a process pool
+    (workers=1 plays them in this process)"""
+    tasks = []
+    for group, (level, count) in enumerate(product(levels, bots)):
+        for start in range(0, games, chunk):
+            tasks.append((level, count, min(chunk, games - start),
+                          None if seed is None else seed + group * games + start))
+    if workers == 1:
+        return Results.concatenate(map(_simulate, tasks))
+    with ProcessPoolExecutor(workers) as executor:
+        return Results.concatenate(executor.map(_simulate, tasks))
+
+
+def summarize(results: Results, quantiles: Iterable[float] = QUANTILES) -> list[dict]:
+    """Histogram, quantiles and winner position bias of every (level, bots) group"""
+    quantiles = tuple(quantiles)
+    if not results.Games:
+        return []
+    # Levels and bot counts are small, so groups are found by counting dense keys, not sorting
+    stride = int(results.bots.max()) + 1
+    key = results.level * stride + results.bots
+    present = np.flatnonzero(np.bincount(key))
+    lookup = np.zeros(present[-1] + 1, dtype=np.int64)
+    lookup[present] = np.arange(len(present))
+    group = lookup[key]
+    groups = np.stack(np.divmod(present, stride), axis=1)
+    count = len(groups)
+    games = np.bincount(group, minlength=count)
+
+    # One histogram row per group: turns 0..width-1
+    width = int(results.turns.max()) + 1
+    histogram = np.bincount(group * width + results.turns,
+                            minlength=count * width).reshape(count, width)
+    cumulative = histogram.cumsum(axis=1)
+    # Inverted CDF: smallest number of turns reaching the quantile's share of games
+    needed = np.ceil(np.outer(games, quantiles)).astype(np.int64)
+    marks = (cumulative[:, None, :] < needed[:, :, None]).sum(axis=2)
+    turns_sum = np.bincount(group, weights=results.turns, minlength=count)
+    squares = np.bincount(group, weights=results.turns.astype(np.float64) ** 2, minlength=count)
+    mean = turns_sum / games
+    std = np.sqrt(np.maximum(squares / games - mean ** 2, 0))
+
+    # Seat 0 is "nobody won"; seats 1.. are the bots in order
+    wins = np.bincount(group * stride + results.winner + 1,
+                       minlength=count * stride).reshape(count, stride)
+
+    summary = []
+    for index, (level, bots) in enumerate(groups.tolist()):
+        row = histogram[index]
+        first, last = np.flatnonzero(row)[[0, -1]]
+        summary.append({
+            "Level": level,
+            "Range": list(BaseGame.level.get(level, (0, 0))[::-1]),
+            "Bots": bots,
+            "Games": int(games[index]),
+            "Mean": float(mean[index]),
+            "Std": float(std[index]),
+            "Min": int(first),
+            "Max": int(last),
+            "Quantiles": {f"p{quantile * 100:g}": int(mark)
+                          for quantile, mark in zip(quantiles, marks[index])},
+            "Histogram": {"Start": int(first), "Counts": row[first:last + 1].tolist()},
+            "NoWinner": float(wins[index, 0] / games[index]),
+            "WinShare": (wins[index, 1:bots + 1] / games[index]).tolist(),
+        })
+    return summary
+
+
+def to_json(summary: list[dict], path: str):
+    with open(path, 'w') as file:
+        json.dump(summary, file, indent=2)
+
+
+def to_csv(summary: list[dict], path: str, histogram_path: str | None = None):
+    """One row per group (quantiles and win shares as columns) and, with histogram_path,
+    the histograms as (level, bots, turns, games) rows"""
+    quantiles = list(summary[0]["Quantiles"]) if summary else []
+    seats = max((row["Bots"] for row in summary), default=0)
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["level", "bots", "games", "mean", "std", "min", "max", *quantiles,
+                         "no_winner", *(f"win_seat_{seat}" for seat in range(seats))])
+        for row in summary:
+            shares = [f"{share:.4f}" for share in row["WinShare"]]
+            writer.writerow([row["Level"], row["Bots"], row["Games"], f"{row['Mean']:.4f}",
+                             f"{row['Std']:.4f}", row["Min"], row["Max"],
+                             *(row["Quantiles"][name] for name in quantiles),
+                             f"{row['NoWinner']:.4f}", *shares, *[''] * (seats - len(shares))])
+    if histogram_path is None:
+        return
+    with open(histogram_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["level", "bots", "turns", "games"])
+        for row in summary:
+            start = row["Histogram"]["Start"]
+            for offset, games in enumerate(row["Histogram"]["Counts"]):
+                if games:
+                    writer.writerow(
+                        [row["Level"], row["Bots"], start + offset, games])
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="python -m packs.analytics",
+                            description="Simulate GTRNv2 games and summarise turns to win per level.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 3],
+                        choices=tuple(BaseGame.level), metavar="LEVEL",
+                        help=f"Keys of BaseGame.level ({min(BaseGame.level)}-{max(BaseGame.level)})")
+    parser.add_argument("--bots", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--games", type=int, default=1000,
+                        help="Games per level and bot count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Simulation processes (default: one per core)")
+    parser.add_argument("--results", metavar="PATH.npz",
+                        help="Summarise saved results instead of simulating")
+    parser.add_argument("--save", metavar="PATH.npz",
+                        help="Also save the raw results")
+    parser.add_argument("--output", default=GameConfig.LogPath,
+                        help="Report directory (default: GameConfig.LogPath)")
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    if args.results:
+        results = Results.load(args.results)
+    else:
+        results = simulate_many(args.levels, args.bots,
+                                args.games, args.seed, args.workers)
+    simulated = perf_counter()
+    summary = summarize(results)
+    summarized = perf_counter()
+    if args.save:
+        results.save(args.save)
+
+    os.makedirs(args.output, 0o700, True)
+    prefix = os.path.join(
+        args.output, f"analytics-{strftime('%Y%m%d-%H%M%S')}")
+    to_json(summary, f"{prefix}.json")
+    to_csv(summary, f"{prefix}.csv", f"{prefix}-histogram.csv")
+    print(f"[GTRNv2] {results.Games} game(s) in {simulated - start:.2f}s, summarised in "
+          f"{(summarized - simulated) * 1000:.1f}ms: {prefix}.json, {prefix}.csv")
+    for row in summary:
+        quantiles = ' '.join(f"{name}={value}" for name,
+                             value in row["Quantiles"].items())
+        print(f"  L{row['Level']:<3} bots={row['Bots']:<3} mean={row['Mean']:.2f} {quantiles} "
+              f"seats={' '.join(f'{share:.2f}' for share in row['WinShare'])}")
+
+
+if __name__ == "__main__":
+    main()
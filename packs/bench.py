@@ -0,0 +1,130 @@
+"""Microbenchmarks
+
+    python -m packs.bench codec
+    python -m packs.bench history
+
+Timing benchmarks print the best time per operation over a few repeats and the
+matching operations per second on one core; memory benchmarks print the bytes
+allocated per TURNS turns."""
+
+import tracemalloc
+from argparse import ArgumentParser
+from random import Random
+from timeit import Timer
+from typing import Callable
+
+# Turns played by the memory benchmarks
+TURNS = 1000
+
+
+def measure(name: str, func: Callable[[], object], number: int, repeat: int = 5):
+    """Time func and print its best per-call cost"""
+    best = min(Timer(func).repeat(repeat, number)) / number
+    print(f"{name:<40} {best * 1e9:>10.0f} ns/op {1 / best:>14,.0f} op/s")
+    return best
+
+
+def footprint(name: str, func: Callable[[], object]):
+    """Print the bytes still allocated by func (and kept alive by its result)"""
+    tracemalloc.start()
+    try:
+        kept = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    print(f"{name:<40} {size:>10,} B/{TURNS} turns")
+    return size
+
+
+def bench_codec(number: int):
+    """libnetutil status lookup, command tokenizer and frame codec"""
+    from .network.libnetutil import (FrameDecoder, StatusENUM, _load_message,
+                                     _parse_message, encode_frame, parse_command)
+
+    summary = "Push Guess[-12345] to Room[42] as self[Ym9i:lZOs7EH47_BM2_UsEXR7bxaf]"
+    frame = encode_frame(302, summary)
+    batch = frame * 64
+    decoder = FrameDecoder()
+
+    def decode_one():
+        decoder.feed(frame)
+        for item in decoder.frames():
+            parse_command(item.text()[0])
+
+    def decode_batch():
+        decoder.feed(batch)
+        for item in decoder.frames():
+            parse_command(item.text()[0])
+
+    measure("StatusENUM.get", lambda: StatusENUM.get(202), number)
+    measure("_load_message (response)",
+            lambda: _load_message("Connected You[lZOs7EH47_BM2_UsEXR7bxaf]"), number)
+    measure("_parse_message", lambda: _parse_message(
+        Guess=-12345, Room=42, self=("Ym9i", "lZOs7EH47_BM2_UsEXR7bxaf")), number)
+    measure("parse_command", lambda: parse_command(summary), number)
+    measure("encode_frame", lambda: encode_frame(302, summary), number)
+    measure("decode + parse (1 frame per read)", decode_one, number)
+    per_batch = measure("decode + parse (64 frames per read)",
+                        decode_batch, max(number // 64, 1))
+    print(f"{'  per message':<40} {per_batch / 64 * 1e9:>10.0f} ns/op {64 / per_batch:>14,.0f} op/s")
+
+
+def bench_history(number: int):
+    """Player history memory: Guesses against a list, and a whole Bot"""
+    from .game import BaseGame
+    from .players import Guesses
+    from .players.bot import Bot
+    from .utility.identifiers import Identifier, big, small
+
+    for level in (5, 55, 100):
+        high, low = BaseGame.level[level]
+
+        def guesses():
+            # Fresh int objects, as a game makes them
+            rng = Random(level)
+            return (rng.randint(low, high) for _ in range(TURNS))
+
+        def played(store):
+            for value in guesses():
+                store.append(value)
+            return store
+
+        def bot():
+            player = Bot("Bot-0", level)
+            for value in guesses():
+                player._last.append(value)
+                player.critical_put(Identifier(
+                    player, small if value < 0 else big, value))
+            return player
+
+        footprint(f"list (level {level})", lambda: played([]))
+        footprint(f"Guesses (level {level})", lambda: played(Guesses()))
+        footprint(f"Bot (level {level})", bot)
+
+
+BENCHMARKS = {
+    "codec": bench_codec,
+    "history": bench_history,
+}
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="python -m packs.bench",
+                            description="Run GTRNv2 microbenchmarks.")
+    parser.add_argument("names", nargs="*", metavar="NAME",
+                        help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--number", type=int, default=20_000,
+                        help="Calls per repeat")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+    for name in args.names or BENCHMARKS:
+        print(f"[{name}] {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name](args.number)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ GameConfig = Configuration("GameConfig",
                                "CrashLogPath": "project:///crash/",
                                "PluginPath": "project:///plugins/",
                                "DownloadPath": "project:///downloads/",
+                               "SessionPath": "project:///sessions.json",
+                               "ReplayPath": "project:///replays/",
+                               "CheckpointPath": "project:///checkpoints/",
                                "IsDebug": True})
 SQLConfig = Configuration("SQLConfig", {
     "ChangeInner": False,  # Change in dcur.fetchX()
@@ -3,7 +3,7 @@
 from typing import Generator, Self
 from uuid import UUID
 
-from sqlite_database import Database, integer, op, text
+from sqlite_database import Database, integer, op, real, text
 
 from ..config import GameConfig
 from ..utility import make_uid
@@ -42,7 +42,7 @@ class GameDB:
             text("player_1").foreign("users/uid"),
             text("player_2").foreign("users/uid"),
             integer("winner"),
-            integer("mystery")
+            text("mystery")  # Up to 2**105: beyond SQLite's 64-bit integers
         ])
         # users.insert({
         #     "uid": str(UUID(int=0)),
@@ -51,6 +51,10 @@ class GameDB:
         self.add_user("debug")
 
     def __init__(self):
+        if hasattr(self, '_db'):
+            # Already open: every game calls GameDB(), which must not reconnect (or, in
+            # debug, replace the in-memory database).
+            return
         if GameConfig.IsDebug is True:
             self._db = Database(":memory:")
             self.__initdb__()
@@ -78,6 +82,8 @@ class GameDB:
         """Remove user"""
         stuid = uid if isinstance(uid, str) else str(uid)
         # self._db.execute('delete from users where uid=:uid', {"uid": stuid})
+        if self._db.check_table("credentials"):
+            self._db.table("credentials").delete({"uid": op == stuid})
         self._users.delete_one({
             "uid": op == stuid
         })
@@ -116,7 +122,7 @@ class GameDB:
             text("player_1").foreign("users/uid"),
             text("player_2").foreign("users/uid"),
             integer("winner"),
-            integer("mystery")
+            text("mystery")  # Up to 2**105: beyond SQLite's 64-bit integers
         ])
 
     def reset(self):
@@ -124,9 +130,13 @@ class GameDB:
         # truncate_table(self._db, "users")
         # truncate_table(self._db, 'history')
         # self.add_user('debug')
-        self._db.delete_table('users')
-        self._db.delete_table('history')
-        self.__initdb__()
+        # Emptied rather than dropped: Database.delete_table fails on tables it has opened
+        for name in ("credentials", "leaderboard", "checkpoints"):
+            if self._db.check_table(name):
+                self._db.table(name).delete()
+        self._history.delete()
+        self._users.delete()
+        self.add_user("debug")
 
     def mod_settings(self, **kwargs):
         """Change game config"""
@@ -168,7 +178,7 @@ class GameDB:
             "id": histid
         })
         if history:
-            return History(history.id, history.player_1, history.player_2, history.winner, history.mystery)
+            return History(history.id, history.player_1, history.player_2, history.winner, int(history.mystery))
 
         raise HistoryNotExists("No such history id")
         # if hasattr(histid, 'isnumeric'):
@@ -200,7 +210,7 @@ class GameDB:
             "player_1": stuid0,
             "player_2": stuid1,
             "winner": winner,
-            "mystery": mystery
+            "mystery": str(mystery)
         })
         # if hasattr(histid, 'isnumeric'):
         #     if histid.isnumeric() is False:
@@ -209,6 +219,76 @@ class GameDB:
         # self._db.execute("insert into history values (?, ?, ?, ?, ?)",
         #                  (sthist, stuid0, stuid1, winner, mystery))
 
+    def get_histories(self, after: int = -1, length: int = 1000) -> Generator[tuple[int, History], None, None]:
+        """(row, history) of every history written after row after, in the order they were
+        written, read a page at a time. Rows, unlike match IDs, grow with every insert: shard
+        workers take interleaved match IDs and do not finish matches in ID order."""
+        for page in self._history.paginate_select({"rowid": op > after}, length=length,
+                                                  what=("rowid", "id", "player_1", "player_2", "winner", "mystery"),
+                                                  order=('rowid', 'asc')):
+            for history in page:
+                yield history.rowid, History(history.id, history.player_1, history.player_2,
+                                             history.winner, int(history.mystery))
+
+    def get_users(self) -> Generator[User, None, None]:
+        return (User(user.uid, user.username) for user in self._users.select())
+
+    def get_standings(self) -> tuple[list[dict], int]:
+        """Last leaderboard checkpoint: its rows and the last history row it includes"""
+        if not self._db.check_table("leaderboard"):
+            return [], -1
+        # Named after rows: a checkpoint of the last history id (as they used to be) is ignored
+        checkpoint = self._db.table("checkpoints").select_one(
+            {"name": "leaderboard-row"})
+        if not checkpoint:
+            return [], -1
+        return self._db.table("leaderboard").select(), checkpoint.value
+
+    def _empty_table(self, name: str, columns: list):
+        if not self._db.check_table(name):
+            return self._db.create_table(name, columns)
+        table = self._db.table(name)
+        table.delete()
+        return table
+
+    def save_standings(self, rows: list[dict], last: int):
+        """Replace the leaderboard checkpoint"""
+        leaderboard = self._empty_table("leaderboard", [
+            text("uid").primary(),
+            real("rating"),
+            integer("wins"),
+            integer("losses")
+        ])
+        if rows:
+            leaderboard.insert_many(rows)
+        self._empty_table("checkpoints", [
+            text("name").primary(),
+            integer("value")
+        ]).insert({"name": "leaderboard-row", "value": last})
+
+    def set_credentials(self, uid: UID, salt: bytes, digest: bytes):
+        """Save the password salt and digest of a user"""
+        stuid = uid if isinstance(uid, str) else str(uid)
+        if self._db.check_table("credentials"):
+            credentials = self._db.table("credentials")
+        else:
+            credentials = self._db.create_table("credentials", [
+                text("uid").primary().foreign("users/uid"),
+                text("salt"),
+                text("digest")
+            ])
+        credentials.delete({"uid": op == stuid})
+        credentials.insert({"uid": stuid, "salt": salt.hex(), "digest": digest.hex()})
+
+    def get_credentials(self) -> Generator[tuple[User, bytes, bytes], None, None]:
+        """(user, salt, digest) of every user with a password"""
+        if not self._db.check_table("credentials"):
+            return
+        users = {user.uid: user for user in self.get_users()}
+        for row in self._db.table("credentials").select():
+            if row.uid in users:
+                yield users[row.uid], bytes.fromhex(row.salt), bytes.fromhex(row.digest)
+
     def get_users_uid(self) -> Generator[str, None, None]:
         # const = "select uid from users"
         # cur = self._db.execute(const)
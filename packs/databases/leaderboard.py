@@ -0,0 +1,246 @@
+"""Leaderboard
+
+Elo ratings kept up to date from match results as they are recorded. Standings live in a
+treap ordered by (-rating, uid) whose nodes know the size of their subtree, so the rank of a
+user, the user at a rank and so top-K and neighbourhood queries cost O(log n) per entry.
+The board is checkpointed into the database and, on load, rebuilt from the checkpoint plus
+the history recorded after it (or from the whole history when there is no checkpoint).
+
+Matches are applied in the order their history rows were written, never in match ID order:
+boards refreshed from the same history table (every worker of a shard has one) agree."""
+
+from random import random
+from typing import Iterator, NamedTuple
+
+from ..utility import default_uid
+from .errors import UserNotExists
+from .game import GameDB
+
+
+class _Node:
+    __slots__ = ('key', 'priority', 'left', 'right', 'size')
+
+    def __init__(self, key: tuple):
+        self.key = key
+        self.priority = random()
+        self.left: _Node | None = None
+        self.right: _Node | None = None
+        self.size = 1
+
+
+def _size(node: _Node | None) -> int:
+    return node.size if node is not None else 0
+
+
+def _split(node: _Node | None, key: tuple) -> tuple[_Node | None, _Node | None]:
+    """Split into the keys below key and the rest"""
+    if node is None:
+        return None, None
+    if node.key < key:
+        node.right, right = _split(node.right, key)
+        node.size = 1 + _size(node.left) + _size(node.right)
+        return node, right
+    left, node.left = _split(node.left, key)
+    node.size = 1 + _size(node.left) + _size(node.right)
+    return left, node
+
+
+def _merge(left: _Node | None, right: _Node | None) -> _Node | None:
+    """Join two treaps, every key of left being below every key of right"""
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.size = 1 + _size(left.left) + _size(left.right)
+        return left
+    right.left = _merge(left, right.left)
+    right.size = 1 + _size(right.left) + _size(right.right)
+    return right
+
+
+def _remove(node: _Node, key: tuple) -> _Node | None:
+    if node.key == key:
+        return _merge(node.left, node.right)
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    else:
+        node.right = _remove(node.right, key)
+    node.size -= 1
+    return node
+
+
+class RankTree:
+    """Sorted keys with O(log n) insert, remove, rank and select (expected)"""
+
+    def __init__(self):
+        self._root: _Node | None = None
+
+    def __len__(self):
+        return _size(self._root)
+
+    def insert(self, key: tuple):
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key)), right)
+
+    def remove(self, key: tuple):
+        """Remove a key that is in the tree"""
+        self._root = _remove(self._root, key)
+
+    def rank(self, key: tuple) -> int:
+        """Number of keys below key"""
+        node, rank = self._root, 0
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif key > node.key:
+                rank += _size(node.left) + 1
+                node = node.right
+            else:
+                return rank + _size(node.left)
+        return rank
+
+    def select(self, index: int) -> tuple:
+        """Key at index (0 is the smallest)"""
+        if not 0 <= index < len(self):
+            raise IndexError("rank out of range")
+        node = self._root
+        while True:
+            below = _size(node.left)
+            if index < below:
+                node = node.left
+            elif index == below:
+                return node.key
+            else:
+                index -= below + 1
+                node = node.right
+
+    def slice(self, start: int, stop: int) -> Iterator[tuple]:
+        for index in range(max(start, 0), min(stop, len(self))):
+            yield self.select(index)
+
+
+class Standing(NamedTuple):
+    rank: int  # 1 is the best
+    uid: str
+    name: str
+    rating: float
+    wins: int
+    losses: int
+
+
+class Leaderboard:
+    """Elo ratings of every user who has played a recorded match.
+
+    Only player_1 and player_2 of a history count. Bots (the default user ID) are not
+    ranked and play at the initial rating; a match won by somebody else, or by both of them
+    in the same turn, is a draw."""
+
+    def __init__(self, database: GameDB | None = None, *, k: float = 32, initial: float = 1000):
+        self._database = database or GameDB()
+        self._k = k
+        self._initial = initial
+        self._tree = RankTree()
+        self._ratings: dict[str, list] = {}  # uid -> [rating, wins, losses]
+        self._names: dict[str, str] = {}
+        self._last = -1
+
+    def __len__(self):
+        return len(self._tree)
+
+    def __contains__(self, uid: str):
+        return uid in self._ratings
+
+    def load(self) -> int:
+        """Rebuild from the last checkpoint and the history after it. Returns the matches replayed."""
+        self._tree = RankTree()
+        self._ratings.clear()
+        rows, self._last = self._database.get_standings()
+        for row in rows:
+            self._ratings[row.uid] = [row.rating, row.wins, row.losses]
+            self._tree.insert((-row.rating, row.uid))
+        self._names = {
+            user.uid: user.username for user in self._database.get_users()}
+        return self.refresh()
+
+    def refresh(self) -> int:
+        """Apply the history written since the last row applied. Returns the matches applied."""
+        applied = 0
+        for row, history in self._database.get_histories(self._last):
+            for uid in (history.player_1, history.player_2):
+                if uid not in self._names and uid != str(default_uid):
+                    try:
+                        self._names[uid] = self._database.get_user(uid).username
+                    except UserNotExists:
+                        self._names[uid] = ''
+            self.record(history.id, history.player_1,
+                        history.player_2, history.winner)
+            self._last = row
+            applied += 1
+        return applied
+
+    def checkpoint(self):
+        self._database.save_standings([
+            {"uid": uid, "rating": rating, "wins": wins, "losses": losses}
+            for uid, (rating, wins, losses) in self._ratings.items()], self._last)
+
+    def record(self, histid: int, player1: str, player2: str, winner: int, names: dict[str, str] | None = None):
+        """Apply the result of a match (winner: 1 or 2 for player_1 or player_2, anything else a draw)"""
+        if names:
+            self._names.update(names)
+        rating1, rating2 = self.rating(player1), self.rating(player2)
+        expected = 1 / (1 + 10 ** ((rating2 - rating1) / 400))
+        score = 1.0 if winner == 1 else (0.0 if winner == 2 else 0.5)
+        self._update(player1, rating1 + self._k * (score - expected),
+                     winner == 1, winner == 2)
+        self._update(player2, rating2 + self._k * (expected - score),
+                     winner == 2, winner == 1)
+
+    def rating(self, uid: str) -> float:
+        """Rating of a user (the initial rating when unranked)"""
+        entry = self._ratings.get(uid)
+        return entry[0] if entry is not None else self._initial
+
+    def _update(self, uid: str, rating: float, won: bool, lost: bool):
+        if uid == str(default_uid):
+            return
+        entry = self._ratings.get(uid)
+        if entry is None:
+            entry = self._ratings[uid] = [rating, 0, 0]
+        else:
+            self._tree.remove((-entry[0], uid))
+            entry[0] = rating
+        entry[1] += won
+        entry[2] += lost
+        self._tree.insert((-rating, uid))
+
+    def _standing(self, index: int, key: tuple) -> Standing:
+        uid = key[1]
+        rating, wins, losses = self._ratings[uid]
+        return Standing(index + 1, uid, self._names.get(uid, ''), rating, wins, losses)
+
+    def top(self, count: int = 10) -> list[Standing]:
+        return [self._standing(index, self._tree.select(index))
+                for index in range(min(count, len(self._tree)))]
+
+    def rank(self, uid: str) -> int | None:
+        """Rank of a user, 1 being the best. None when unranked."""
+        entry = self._ratings.get(uid)
+        if entry is None:
+            return None
+        return self._tree.rank((-entry[0], uid)) + 1
+
+    def at(self, rank: int) -> Standing:
+        return self._standing(rank - 1, self._tree.select(rank - 1))
+
+    def around(self, rank: int, radius: int = 2) -> list[Standing]:
+        """Standings from rank - radius to rank + radius"""
+        start = max(rank - 1 - radius, 0)
+        return [self._standing(start + offset, key)
+                for offset, key in enumerate(self._tree.slice(start, rank + radius))]
+
+    @property
+    def Last(self):
+        """Last history row applied (see GameDB.get_histories)"""
+        return self._last
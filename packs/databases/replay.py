@@ -0,0 +1,46 @@
+"""Replay records
+
+Every match is kept as one JSON-lines file: a header, one line per played turn and an end
+line. Lines are appended as the match is played and read back one at a time, so neither
+recording nor replaying holds a whole match in memory."""
+
+import json
+import os
+from typing import BinaryIO
+
+from ..config import GameConfig
+
+
+class ReplayStore:
+    """Per-turn records of matches, one file per match ID"""
+
+    def __init__(self, path: str | None = None):
+        self._path = path or GameConfig.ReplayPath
+        os.makedirs(self._path, 0o700, True)
+
+    def path(self, match: int) -> str:
+        return os.path.join(self._path, f"{int(match)}.jsonl")
+
+    def _append(self, match: int, record: dict):
+        with open(self.path(match), 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record) + '\n')
+
+    def begin(self, match: int, header: dict):
+        """Start the records of a match with its header"""
+        with open(self.path(match), 'w', encoding='utf-8') as file:
+            file.write(json.dumps(dict(header, Match=match)) + '\n')
+
+    def turn(self, match: int, record: dict):
+        self._append(match, record)
+
+    def end(self, match: int, record: dict):
+        """Close the records of a match. The end line starts with {"End": true."""
+        self._append(match, dict(End=True, **record))
+
+    def __contains__(self, match: int):
+        return os.path.exists(self.path(match))
+
+    def open(self, match: int) -> BinaryIO:
+        """Records of a match, one UTF-8 JSON line each, starting with the header. Reading on
+        past the end later returns the lines appended meanwhile."""
+        return open(self.path(match), 'rb')
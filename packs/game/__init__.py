@@ -1,3 +1,4 @@
+from random import Random, getrandbits
 from typing import Any, Protocol
 
 
@@ -26,18 +27,12 @@ class ProtoGame(Protocol):
 
 
 class BaseGame:
-    _instance = {}
+    """Every instance is an independent game; packs.game.manager keeps many of them by ID."""
     level: dict[int, tuple[int, int]] = {i: (2**v, -2**v)
                                          for i, v in enumerate(range(5, 106))}
 
-    def __new__(cls, *args, **kwargs):
-        if cls in BaseGame._instance:
-            return BaseGame._instance[cls]
-        self = super().__new__(cls)
-        cls._instance[cls] = self
-        return self
-
     def __init__(self):
+        self._gid: int | None = None
         self._players: list[ProtoPlayer] = []
         self._mystery = None
         self._running = False
@@ -46,6 +41,10 @@ class BaseGame:
         self._turn = 0
         self._winner = []
         self._upheld = "none"
+        self._seed: int | None = None
+        self._next_seed: int | None = None
+        # A pooled game being reused keeps its generator; run() reseeds it anyway.
+        self._random = getattr(self, '_random', None) or Random()
 
     def register_player(self, player: Any):
         if self._running is True:
@@ -65,6 +64,20 @@ class BaseGame:
             return
         self._level = level if isinstance(level, int) else 0
 
+    def set_seed(self, seed: int | None):
+        """Seed of the next game (None: a fresh one). A game is reproduced by its seed, level and players."""
+        if self._running is True:
+            return
+        self._next_seed = seed
+
+    def _reseed(self):
+        """Seed the game's own generator for a new game and hand it to the players"""
+        self._seed = self._next_seed if self._next_seed is not None else getrandbits(64)
+        self._next_seed = None
+        self._random.seed(self._seed)
+        for player in self._players:
+            player.use_random(self._random)
+
     def run(self):
         """Re-define this method on your new class.
 
@@ -104,5 +117,15 @@ class BaseGame:
     def Level(self):
         return self._level
 
+    @property
+    def ID(self):
+        """Game ID given by the GameManager (None when unmanaged)"""
+        return self._gid
+
+    @property
+    def Seed(self):
+        """Seed of the current (or last) game"""
+        return self._seed
+
     def __repr__(self):
         return f"<{type(self).__name__} State={self._upheld} Players={len(self._players)} Running={self._running}>"
@@ -0,0 +1,266 @@
+"""Game checkpoints
+
+A compact binary snapshot of a game and its players: the mystery number, turn, winners,
+the seed and state of the game's generator, every player's history and, for bots, their search bounds, guesses and pending verdicts.
+Everything numeric goes into one integer stream written as a single array('q') (or, past
+64 bits, fixed-width big integers), names and class paths into one string table, so a
+snapshot of a running game takes microseconds to write and load() restores it exactly.
+
+Layout: HEADER (magic, version, integer width, integer count, string table size, generator
+state words), the NUL-separated UTF-8 string table, the 32-bit words of the generator state,
+then the integers, all little-endian."""
+
+import os
+import sys
+from array import array
+from importlib import import_module
+from random import Random
+from struct import Struct
+from uuid import UUID
+
+from . import BaseGame
+from .room import RoomGame
+from ..databases.game import GameDB
+from ..players import BasePlayer, Guesses
+from ..players.bot import Bot
+from ..players.remote import RemotePlayer
+from ..utility.identifiers import Identifier, big, equal, small
+
+HEADER = Struct("<4sBBIIH")
+MAGIC = b"GTRC"
+VERSION = 4
+
+_SYMBOLS = (small, equal, big)
+_UPHELD = ("none", "stop")
+
+
+class CheckpointError(ValueError):
+    """Snapshot is damaged or was written by an unknown version"""
+
+
+def _path(obj: object) -> str:
+    return f"{type(obj).__module__}:{type(obj).__qualname__}"
+
+
+def _class(path: str, base: type) -> type:
+    """The subclass of base at path. Only modules of this package, or ones already imported
+    (plugins), are imported: a snapshot must not run whatever code it names."""
+    module, _, name = path.partition(':')
+    if module not in sys.modules and module.partition('.')[0] != __name__.partition('.')[0]:
+        raise CheckpointError(f"Snapshot names a class outside the game: {path}")
+    target = import_module(module)
+    for part in name.split('.'):
+        target = getattr(target, part)
+    if not (isinstance(target, type) and issubclass(target, base)):
+        raise CheckpointError(f"{path} is not a {base.__name__}")
+    return target
+
+
+class _Writer:
+    def __init__(self, players: list):
+        self.ints: list[int] = []
+        self.strings: list[str] = []
+        self.state = array('I')
+        self._index = {id(player): index for index,
+                       player in enumerate(players)}
+
+    def sequence(self, values):
+        self.ints.append(len(values))
+        self.ints.extend(values)
+
+    def identifier(self, identifier: Identifier | None):
+        if identifier is None:
+            self.ints.append(0)
+            return
+        player = self._index.get(id(identifier.player), -1)
+        self.ints.extend((1, player, _SYMBOLS.index(
+            identifier.was), identifier.value))
+
+    def identifiers(self, identifiers: list[Identifier]):
+        self.ints.append(len(identifiers))
+        for identifier in identifiers:
+            self.identifier(identifier)
+
+    def encode(self) -> bytes:
+        strings = '\0'.join(self.strings).encode('utf-8')
+        bits = max((abs(value).bit_length()
+                   for value in self.ints), default=0)
+        if bits < 64:
+            width = 8
+            numbers = array('q', self.ints)
+            if sys.byteorder == 'big':
+                numbers.byteswap()
+            body = numbers.tobytes()
+        else:
+            width = bits // 8 + 1
+            body = b''.join(value.to_bytes(width, 'little', signed=True)
+                            for value in self.ints)
+        state = self.state
+        if sys.byteorder == 'big':
+            state.byteswap()
+        return b''.join((HEADER.pack(MAGIC, VERSION, width, len(self.ints), len(strings), len(state)),
+                         strings, state.tobytes(), body))
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        try:
+            magic, version, width, count, size, words = HEADER.unpack_from(data)
+        except Exception:
+            raise CheckpointError("Snapshot is too short") from None
+        if magic != MAGIC or version != VERSION:
+            raise CheckpointError(
+                f"Not a version {VERSION} snapshot")
+        state = HEADER.size + size
+        start = state + 4 * words
+        if len(data) != start + width * count:
+            raise CheckpointError("Snapshot is truncated")
+        self.strings = iter(
+            bytes(data[HEADER.size:state]).decode('utf-8').split('\0'))
+        self.state = array('I')
+        self.state.frombytes(data[state:start])
+        if sys.byteorder == 'big':
+            self.state.byteswap()
+        if width == 8:
+            numbers = array('q')
+            numbers.frombytes(data[start:])
+            if sys.byteorder == 'big':
+                numbers.byteswap()
+            self.ints = iter(numbers)
+        else:
+            self.ints = iter([int.from_bytes(data[offset:offset + width], 'little', signed=True)
+                              for offset in range(start, len(data), width)])
+        self.players: list = []
+
+    def int(self) -> int:
+        return next(self.ints)
+
+    def sequence(self) -> list[int]:
+        return [next(self.ints) for _ in range(next(self.ints))]
+
+    def identifier(self) -> Identifier | None:
+        if next(self.ints) == 0:
+            return None
+        player, was, value = next(self.ints), next(self.ints), next(self.ints)
+        return Identifier(self.players[player] if player >= 0 else None, _SYMBOLS[was], value)
+
+    def identifiers(self) -> list[Identifier]:
+        return [self.identifier() for _ in range(next(self.ints))]
+
+
+def dump(game: BaseGame) -> bytes:
+    """Snapshot of a game and its players"""
+    players = list(game._players)
+    writer = _Writer(players)
+    writer.strings.append(_path(game))
+    writer.ints.extend((game._level, game._mystery is not None, game._mystery or 0, game._turn,
+                        game._running, _UPHELD.index(game._upheld), game._seed is not None, game._seed or 0))
+    version, state, _ = game._random.getstate()
+    writer.state.extend(state)
+    writer.ints.extend((version, len(players)))
+    for player in players:
+        writer.strings.extend((_path(player), player._name, str(player._uid)))
+        writer.ints.extend(
+            (isinstance(player._uid, UUID), player._level))
+        writer.sequence(player._history)
+        if isinstance(player, Bot):
+            writer.strings.extend(
+                (float(player._explore).hex(), float(player._bias).hex()))
+            writer.ints.extend((player._min, player._max, player._level_min,
+                                player._level_max, player._max_pending))
+            writer.sequence(player._last)
+            writer.ints.extend((player._floor is not None, player._floor or 0,
+                                player._ceiling is not None, player._ceiling or 0))
+            writer.identifiers(player._pendings)
+        elif isinstance(player, RemotePlayer):
+            writer.ints.extend(
+                (player._pending is not None, player._pending or 0))
+    for player in players:
+        writer.identifier(player._state)
+    writer.sequence([players.index(player) for player in game._winner])
+    writer.identifiers(getattr(game, '_verdicts', []))
+    return writer.encode()
+
+
+def _new(cls: type):
+    # Bypasses __init__; everything it would set comes from the snapshot
+    return object.__new__(cls)
+
+
+def load(data: bytes, database: GameDB | None = None, **attributes) -> BaseGame:
+    """Game restored from a snapshot made by dump(). The game and its players are new objects.
+    Settings that are not game state (ZeroPlayer's delay, stream and fps, SinglePlayer's
+    stream) can be given as attributes; the others keep the defaults of their class.
+    Whatever is wrong with data raises CheckpointError."""
+    try:
+        return _load(_Reader(data), database, attributes)
+    except CheckpointError:
+        raise
+    except (StopIteration, IndexError, KeyError, ValueError, TypeError, OverflowError,
+            ImportError, AttributeError) as exc:
+        raise CheckpointError(f"Snapshot is damaged ({type(exc).__name__}: {exc})") from None
+
+
+def _load(reader: _Reader, database: GameDB | None, attributes: dict) -> BaseGame:
+    game = _new(_class(next(reader.strings), BaseGame))
+    game._gid = None
+    game._database = database or GameDB()
+    for name, value in attributes.items():
+        setattr(game, f"_{name}", value)
+    game._level = reader.int()
+    has_mystery, mystery = reader.int(), reader.int()
+    game._mystery = mystery if has_mystery else None
+    game._turn = reader.int()
+    game._running = bool(reader.int())
+    game._upheld = _UPHELD[reader.int()]
+    has_seed, seed = reader.int(), reader.int()
+    game._seed = seed if has_seed else None
+    game._next_seed = None
+    # setstate() replaces the whole state, so skip seeding it from os.urandom first
+    game._random = Random.__new__(Random)
+    game._random.setstate((reader.int(), tuple(reader.state), None))
+    players = reader.players
+    game._players = players
+    for _ in range(reader.int()):
+        cls, name, uid = next(reader.strings), next(
+            reader.strings), next(reader.strings)
+        player = _new(_class(cls, BasePlayer))
+        BasePlayer.__init__(player, name, 0)
+        player._uid = UUID(uid) if reader.int() else uid
+        player._level = reader.int()
+        player._history = Guesses(reader.sequence())
+        players.append(player)
+        if isinstance(player, Bot):
+            player._random = game._random
+            player._explore = float.fromhex(next(reader.strings))
+            player._bias = float.fromhex(next(reader.strings))
+            (player._min, player._max, player._level_min,
+             player._level_max, player._max_pending) = (reader.int() for _ in range(5))
+            player._last = Guesses(reader.sequence())
+            has_floor, floor, has_ceiling, ceiling = (
+                reader.int() for _ in range(4))
+            player._floor = floor if has_floor else None
+            player._ceiling = ceiling if has_ceiling else None
+            player._pendings = reader.identifiers()
+        elif isinstance(player, RemotePlayer):
+            has_pending, pending = reader.int(), reader.int()
+            player._pending = pending if has_pending else None
+    for player in players:
+        player._state = reader.identifier()
+    game._winner = [players[index] for index in reader.sequence()]
+    verdicts = reader.identifiers()
+    if isinstance(game, RoomGame):
+        game._verdicts = verdicts
+    return game
+
+
+def save(path: str, game: BaseGame):
+    """Write a snapshot of game to path, replacing the previous one atomically"""
+    with open(f"{path}.tmp", 'wb') as file:
+        file.write(dump(game))
+    os.replace(f"{path}.tmp", path)
+
+
+def restore(path: str, database: GameDB | None = None, **attributes) -> BaseGame:
+    with open(path, 'rb') as file:
+        return load(file.read(), database, **attributes)
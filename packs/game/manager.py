@@ -0,0 +1,76 @@
+"""Game manager
+
+Creates, tracks and retires many independent games in one process. Every game gets an ID
+and retired games are pooled per class (up to pool_size each) so a server starting and
+ending thousands of matches reuses game objects instead of allocating new ones."""
+
+from itertools import count
+from typing import Iterator, TypeVar
+
+from . import BaseGame
+
+GameT = TypeVar('GameT', bound=BaseGame)
+
+
+class GameManager:
+    """Live games by ID and a bounded pool of retired ones"""
+
+    def __init__(self, pool_size: int = 64):
+        self._pool_size = pool_size
+        self._games: dict[int, BaseGame] = {}
+        self._pools: dict[type, list[BaseGame]] = {}
+        self._ids = count(1)
+
+    def __len__(self):
+        return len(self._games)
+
+    def __contains__(self, gid: int):
+        return gid in self._games
+
+    def __iter__(self) -> Iterator[BaseGame]:
+        return iter(tuple(self._games.values()))
+
+    def create(self, cls: type[GameT], *args, **kwargs) -> GameT:
+        """New game of cls, built with cls(*args, **kwargs) or reinitialised from the pool"""
+        pool = self._pools.get(cls)
+        if pool:
+            game = pool.pop()
+            game.__init__(*args, **kwargs)
+        else:
+            game = cls(*args, **kwargs)
+        return self.add(game)
+
+    def add(self, game: GameT) -> GameT:
+        """Track a game made elsewhere (restored from a checkpoint, for instance)"""
+        game._gid = next(self._ids)
+        self._games[game._gid] = game
+        return game
+
+    def get(self, gid: int) -> BaseGame | None:
+        return self._games.get(gid)
+
+    def retire(self, game: BaseGame | int | None):
+        """Stop tracking a game (or game ID) and pool it. Unknown games are ignored."""
+        if not isinstance(game, BaseGame):
+            game = self._games.get(game)
+        if game is None or self._games.get(game._gid) is not game:
+            return
+        del self._games[game._gid]
+        # Pooled games keep nothing but their generator: no players (nor their sessions)
+        # stay alive, and create() runs __init__ again before reuse.
+        rng = game._random
+        game.__dict__.clear()
+        game._gid = None
+        game._random = rng
+        pool = self._pools.setdefault(type(game), [])
+        if len(pool) < self._pool_size:
+            pool.append(game)
+
+    def clear(self):
+        """Retire every game"""
+        for game in tuple(self._games.values()):
+            self.retire(game)
+
+    @property
+    def Pooled(self):
+        return sum(len(pool) for pool in self._pools.values())
@@ -0,0 +1,95 @@
+"""Terminal renderer
+
+Keeps a model of the lines it last drew at the bottom of the terminal and, for every
+frame, rewrites only the lines that changed, in one write. Frames arriving faster than
+the frame rate cap are dropped (the latest one is kept and drawn by flush()), so a game
+with many bots is bounded by the cap rather than by terminal I/O.
+
+When the stream is not a terminal, changed lines are written plainly, without cursor
+movement, so logs stay readable."""
+
+import shutil
+from sys import stdout
+from time import monotonic
+from typing import Sequence, TextIO
+
+
+class Renderer:
+    """Diffing renderer of a block of lines. fps=None draws every frame."""
+
+    def __init__(self, stream: TextIO = stdout, fps: float | None = 30):
+        self._stream = stream
+        self._interval = 1 / fps if fps else 0
+        self._ansi = stream.isatty() if hasattr(stream, 'isatty') else False
+        self._screen: list[str] = []
+        self._below = 0
+        self._pending: list[str] | None = None
+        self._drawn_at = float('-inf')
+
+    def frame(self, lines: Sequence[str], force: bool = False) -> bool:
+        """Show lines. Returns whether they were drawn now (rather than held back by the cap)."""
+        now = monotonic()
+        if not force and now - self._drawn_at < self._interval:
+            self._pending = list(lines)
+            return False
+        self._pending = None
+        self._drawn_at = now
+        self._draw(list(lines))
+        return True
+
+    def flush(self):
+        """Draw the frame held back by the cap, if any"""
+        if self._pending is not None:
+            self.frame(self._pending, force=True)
+
+    def skip(self, lines: int = 1):
+        """Note that something else (such as input()) wrote lines below the frame"""
+        self._below += lines
+
+    def close(self):
+        """Draw the last frame and leave it on screen"""
+        self.flush()
+        self._screen = []
+        self._below = 0
+
+    def _fit(self, line: str) -> str:
+        width = shutil.get_terminal_size().columns - 1
+        return line if len(line) <= width else line[:width]
+
+    def _draw(self, lines: list[str]):
+        old = self._screen
+        if not self._ansi:
+            changed = [line for index, line in enumerate(lines)
+                       if index >= len(old) or old[index] != line]
+            if changed:
+                self._stream.write('\n'.join(changed) + '\n')
+                self._stream.flush()
+            self._screen = lines
+            self._below = 0
+            return
+        lines = [self._fit(line) for line in lines]
+        # Lines written below the frame are unknown: treat them as changed
+        old = old + [None] * self._below
+        first = next((index for index, (before, after) in enumerate(zip(old, lines))
+                      if before != after), min(len(old), len(lines)))
+        height = max(len(old), len(lines))
+        if first == height:
+            return
+        parts = []
+        up = len(old) - first
+        if up:
+            parts.append(f"\033[{up}A")
+        for index in range(first, height):
+            if index >= len(lines):
+                parts.append("\r\033[2K\n")
+            elif index >= len(old) or old[index] != lines[index]:
+                parts.append(f"\r\033[2K{lines[index]}\n")
+            else:
+                parts.append("\n")
+        if height > len(lines):
+            # Back up over the cleared lines the frame no longer uses
+            parts.append(f"\033[{height - len(lines)}A")
+        self._stream.write(''.join(parts))
+        self._stream.flush()
+        self._screen = lines
+        self._below = 0
@@ -0,0 +1,87 @@
+from typing import Literal
+
+from . import BaseGame
+from ..players.bot import Bot
+from ..players.remote import RemotePlayer
+from ..utility.identifiers import Identifier
+
+# What happens to a remote player who has not guessed when a turn is closed early:
+#   skip    - the player sits the turn out
+#   repeat  - the player's previous guess is played again (skip on the first turn)
+#   forfeit - the player is dropped from the match
+MissingPolicy = Literal["skip", "repeat", "forfeit"]
+
+
+class RoomGame(BaseGame):
+    """Game played turn by turn inside a network room.
+
+    Unlike SinglePlayer and ZeroPlayer nothing blocks: the server submits guesses to the
+    RemotePlayers and calls play_turn() once ready() says so."""
+
+    def __init__(self, level: int = 2):
+        super().__init__()
+        self.set_level(level)
+        self._verdicts: list[Identifier] = []
+
+    def run(self):
+        smin = BaseGame.level.get(self._level, [0, -1024])[1]
+        smax = BaseGame.level.get(self._level, [1024, 0])[0]
+        self._reseed()
+        self._mystery = self._random.randint(smin, smax)
+        self._running = True
+        self._upheld = "none"
+        self._turn = 0
+        for player in self._players:
+            player.tell(maxplayers=len(self._players))
+
+    def start(self):
+        self.run()
+
+    def ready(self) -> bool:
+        """Whether every remote player has submitted a guess for this turn"""
+        return self._running is True and all(
+            player.ready for player in self._players if isinstance(player, RemotePlayer))
+
+    def play_turn(self, missing: MissingPolicy = "skip") -> list[Identifier]:
+        """Collect one guess from every player and return their verdicts.
+        Remote players who have not guessed yet are handled by the missing policy."""
+        self._turn += 1
+        verdicts = []
+        for player in tuple(self._players):
+            if isinstance(player, RemotePlayer) and not player.ready:
+                if missing == "forfeit":
+                    self._players.remove(player)
+                    continue
+                previous = player.last()
+                if missing == "skip" or previous is None:
+                    continue
+                player.submit(previous)
+            identifier = self.scan_value(player, player.get())
+            [_player.push_put(identifier)
+             for _player in self._players if isinstance(_player, Bot)]
+            player.state = identifier
+            verdicts.append(identifier)
+        self._verdicts = verdicts
+        if self._upheld == "stop" or not any(isinstance(player, RemotePlayer) for player in self._players):
+            self._running = False
+        return verdicts
+
+    @property
+    def Players(self):
+        return tuple(self._players)
+
+    @property
+    def Turn(self):
+        return self._turn
+
+    @property
+    def Verdicts(self):
+        return tuple(self._verdicts)
+
+    @property
+    def Winners(self):
+        return tuple(self._winner)
+
+    @property
+    def Mystery(self):
+        return self._mystery
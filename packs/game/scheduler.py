@@ -0,0 +1,74 @@
+"""Turn scheduler
+
+Closes the turns of many RoomGames without a thread or a sleep per room. A turn is played
+as soon as every remote player has guessed, or when its deadline (a timer on the running
+event loop, armed by the turn's first guess) passes; players who missed it are then handled
+by the game's MissingPolicy."""
+
+import asyncio
+from typing import Callable, Hashable
+
+from .room import MissingPolicy, RoomGame
+from ..utility.identifiers import Identifier
+
+
+class TurnScheduler:
+    """Deadlines of the open turns of many rooms.
+
+    Rooms are identified by any hashable key. on_turn(key, game, verdicts) is called after
+    every played turn, whether it was closed by the last guess or by its deadline."""
+
+    def __init__(self, timeout: float | None = 30, missing: MissingPolicy = "skip",
+                 on_turn: Callable[[Hashable, RoomGame, list[Identifier]], None] | None = None):
+        self._timeout = timeout
+        self._missing = missing
+        self._on_turn = on_turn
+        self._deadlines: dict[Hashable, asyncio.TimerHandle] = {}
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable):
+        return key in self._deadlines
+
+    def submitted(self, key: Hashable, game: RoomGame) -> list[Identifier] | None:
+        """Note a guess for game. Plays the turn when it was the last one missing and
+        returns its verdicts; otherwise arms the turn's deadline and returns None."""
+        if game.ready():
+            return self.close(key, game)
+        if key not in self._deadlines and self._timeout is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Without an event loop turns only close on the last guess.
+                return None
+            self._deadlines[key] = loop.call_later(
+                self._timeout, self.close, key, game)
+        return None
+
+    def close(self, key: Hashable, game: RoomGame) -> list[Identifier]:
+        """Play the open turn of game now"""
+        self.discard(key)
+        verdicts = game.play_turn(self._missing)
+        if self._on_turn is not None:
+            self._on_turn(key, game, verdicts)
+        return verdicts
+
+    def discard(self, key: Hashable):
+        """Forget the open turn of key (when its room closes or its match is abandoned)"""
+        handle = self._deadlines.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+
+    def deadline(self, key: Hashable) -> float | None:
+        """Event loop time at which the open turn of key closes"""
+        handle = self._deadlines.get(key)
+        return handle.when() if handle is not None else None
+
+    @property
+    def Timeout(self):
+        return self._timeout
+
+    @property
+    def Missing(self):
+        return self._missing
@@ -1,34 +1,39 @@
-from random import randint
+from sys import stdout
 from time import sleep
+from typing import TextIO
 
 from . import BaseGame
+from .renderer import Renderer
 from ..utility.identifiers import big, small
 from ..players.bot import Bot
+from ..players.player import Player
 
 
 class SinglePlayer(BaseGame):
-    def __init__(self, *players, level=5):
+    # Not game state: the default of games restored by checkpoint.load(), which skips __init__
+    _stream: TextIO = stdout
+
+    def __init__(self, *players, level=5, stream: TextIO = stdout):
         super().__init__()
         self.set_level(level)
+        self._stream = stream
         self._players.extend(players)
 
     def run(self):
         smin = BaseGame.level.get(self._level, [0, -1024])[1]
         smax = BaseGame.level.get(self._level, [1024, 0])[0]
-        self._mystery = randint(smin, smax)
+        self._reseed()
+        self._mystery = self._random.randint(smin, smax)
         self._running = True
         self._turn = 0
         for player in self._players:
             player.tell(maxplayers=len(self._players))
         print(
-            f"[GTRNv2] LEVEL {self._level}! Range {smin} to {smax}")
+            f"[GTRNv2] LEVEL {self._level}! Range {smin} to {smax}", file=self._stream)
+        renderer = Renderer(self._stream)
         while self._running is True:
             self._turn += 1
-            if self._turn > 1:
-                for _ in range(1, len(self._players)+1):
-                    print("\033[1A\033[2K\r", end="")
-                    print("\033[1A\033[2K\r", end="")
-            print(f"Turn {self._turn}\n")
+            renderer.frame(self._board(), force=True)
             for player in self._players:
                 try:
                     player_input = player.get()
@@ -38,15 +43,26 @@ class SinglePlayer(BaseGame):
                     player.state = identifier
                 except KeyboardInterrupt:
                     self._running = False
-                    print("Quitting the game")
-            for player in self._players:
-                if self._players.index(player) == 0:
-                    print(f'\033[{len(self._players)-1}A', end='')
-                print(
-                    f"\033[2K\r{player.name}: {player.history()[-1]} {'(Too big)' if player.state.was is big else ('(Too small)' if player.state.was is small else '(Correct!)')}")
-                sleep(0.1)
+                    print("Quitting the game", file=self._stream)
+                    renderer.skip()
+                if isinstance(player, Player):
+                    # The input prompt took a line below the board
+                    renderer.skip()
+            renderer.frame(self._board(), force=True)
             sleep(2)
             if self._upheld == "stop":
                 self._running = False
+        renderer.close()
         print(
-            f'Game ends in {self._turn} turn(s) with {len(self._winner)} winning player(s)!')
+            f'Game ends in {self._turn} turn(s) with {len(self._winner)} winning player(s)!', file=self._stream)
+
+    def _board(self) -> list[str]:
+        lines = [f"Turn {self._turn}", ""]
+        for player in self._players:
+            state = player.state
+            verdict = '' if state is None else (
+                '(Too big)' if state.was is big else ('(Too small)' if state.was is small else '(Correct!)'))
+            value = player.last()
+            lines.append(
+                f"{player.name}: {'-' if value is None else value} {verdict}".rstrip())
+        return lines
@@ -1,51 +1,89 @@
-from random import randint
 from time import sleep
+from sys import stdout
+from typing import Sequence, TextIO
 
 from . import BaseGame
+from .renderer import Renderer
 from ..utility.identifiers import big, small
 from ..players.bot import Bot
 
 
 class ZeroPlayer(BaseGame):
-    def __init__(self, bots: int = 0, level: int = 5):
+    # Settings, not game state: defaults for games restored by checkpoint.load(), which skips __init__
+    _delay: float = 0.01
+    _stream: TextIO | None = stdout
+    _fps: float | None = 30
+
+    def __init__(self, bots: int = 0, level: int = 5, *, delay: float = 0.01, stream: TextIO | None = stdout,
+                 strategies: Sequence[dict | str] = (), fps: float | None = 30):
+        """Bots-only game. Pass stream=None and delay=0 to run headless.
+        delay is the pause after every turn and fps caps how often the board is redrawn.
+        strategies holds Bot keyword arguments (explore, bias) or plugin strategy names
+        (see packs.plugins) for the first seats."""
         super().__init__()
         self.set_level(level)
-        self._players.append(Bot("Bot-0", self._level))
-        if bots > 1:
-            for a in range(1, bots):
-                self._players.append(Bot(f"Bot-{a}", self._level))
+        self._delay = delay
+        self._stream = stream
+        self._fps = fps
+        for a in range(max(bots, 1)):
+            strategy = strategies[a] if a < len(strategies) else {}
+            cls = Bot
+            if isinstance(strategy, str):
+                from ..plugins import plugins
+                cls, strategy = plugins.strategy(strategy)
+            self._players.append(cls(f"Bot-{a}", self._level, **strategy))
+
+    def _print(self, *args, **kwargs):
+        if self._stream is not None:
+            print(*args, file=self._stream, **kwargs)
 
     def run(self):
         smin = BaseGame.level.get(self._level, [0, -1024])[1]
         smax = BaseGame.level.get(self._level, [1024, 0])[0]
-        self._mystery = randint(smin, smax)
+        self._reseed()
+        self._mystery = self._random.randint(smin, smax)
         self._running = True
         self._turn = 0
         for player in self._players:
             if isinstance(player, Bot):
                 player.tell(maxplayers=len(self._players))
-        print(
+        self._print(
             f"""Mystery Number: {self._mystery} (level {self._level})\nRanging from: {smin} to {smax}""")
+        renderer = Renderer(self._stream, self._fps) if self._stream is not None else None
         while self._running is True:
             self._turn += 1
-            print(f"Turn {self._turn}")
             for player in self._players:
                 try:
                     player_input = player.get()
                     identifier = self.scan_value(player, player_input)
-                    print(
-                        f"{player.name}: {player_input} {'(Too big)' if identifier.was is big else ('(Too small)' if identifier.was is small else 'Correct!')}")
+                    player.state = identifier
                     [_player.push_put(identifier)
                      for _player in self._players if isinstance(_player, Bot)]
-                    sleep(0.01)
                 except KeyboardInterrupt:
                     try:
                         input("Interrupted.")
                     except KeyboardInterrupt:
                         self._running = False
                         break
-            print()
+                    finally:
+                        if renderer is not None:
+                            renderer.skip()
+            if renderer is not None:
+                renderer.frame(self._board())
+            if self._delay:
+                sleep(self._delay)
             if self._upheld == "stop":
                 self._running = False
-        print(
+        if renderer is not None:
+            renderer.close()
+        self._print(
             f'Game ends in {self._turn} turn(s) with {len(self._winner)} winning player(s)!')
+
+    def _board(self) -> list[str]:
+        lines = [f"Turn {self._turn}"]
+        for player in self._players:
+            state = player.state
+            lines.append(
+                f"{player.name}: {state.value} {'(Too big)' if state.was is big else ('(Too small)' if state.was is small else 'Correct!')}"
+                if state is not None else f"{player.name}: -")
+        return lines
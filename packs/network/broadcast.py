@@ -0,0 +1,68 @@
+"""Room broadcast (REQUEST_SUBSCRIBE / REQUEST_DONE)"""
+
+from typing import Protocol
+
+
+class Subscriber(Protocol):
+    """A connection that can receive broadcast frames"""
+    paused: bool
+    closed: bool
+    channels: set['Channel']
+
+    def write(self, data: bytes):
+        pass
+
+    async def drained(self):
+        """Return once the connection is no longer paused"""
+
+
+class Channel:
+    """Broadcast subscribers of one room.
+
+    An update is encoded once by the publisher and the same bytes are written to every
+    subscriber. A subscriber whose transport is paused (its client stopped reading) is only
+    marked stale; once it drains it gets the latest update instead of every one it missed,
+    so a lagging spectator never holds up the room or grows its send buffer."""
+
+    def __init__(self, rid: int):
+        self.rid = rid
+        self._subscribers: dict[Subscriber, bool] = {}
+        self._latest: bytes | None = None
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def __contains__(self, subscriber: Subscriber):
+        return subscriber in self._subscribers
+
+    def add(self, subscriber: Subscriber):
+        self._subscribers[subscriber] = False
+        subscriber.channels.add(self)
+
+    def discard(self, subscriber: Subscriber):
+        self._subscribers.pop(subscriber, None)
+        subscriber.channels.discard(self)
+
+    def publish(self, frame: bytes):
+        """Send an encoded frame to every subscriber that keeps up"""
+        self._latest = frame
+        subscribers = self._subscribers
+        for subscriber in subscribers:
+            if subscriber.paused:
+                subscribers[subscriber] = True
+            else:
+                subscriber.write(frame)
+
+    def flush(self, subscriber: Subscriber):
+        """Catch a drained subscriber up with the latest update"""
+        if self._subscribers.get(subscriber) is True and self._latest is not None:
+            self._subscribers[subscriber] = False
+            subscriber.write(self._latest)
+
+    def close(self, frame: bytes):
+        """Send a final frame to everyone and drop all subscribers"""
+        for subscriber in self._subscribers:
+            subscriber.write(frame)
+            subscriber.channels.discard(self)
+        self._subscribers.clear()
+        self._latest = None
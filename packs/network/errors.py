@@ -0,0 +1,13 @@
+"""Errors"""
+
+from .libnetutil import StatusContent
+
+
+class RequestError(Exception):
+    """A request cannot be served. Carries the status (and body) sent back to the client."""
+
+    def __init__(self, status: StatusContent, message: str = '', body: str = ''):
+        super().__init__(message or status.description)
+        self.status = status
+        self.message = message or status.description
+        self.body = body
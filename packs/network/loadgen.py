@@ -0,0 +1,180 @@
+"""Load generator
+
+Starts simulated players whose guesses come from the Bot strategy. They log into a room
+server, fill rooms, play full games through the libnetutil protocol and report requests
+per second plus p50/p95/p99 latency per command.
+
+    python -m packs.network.loadgen --players 400 --room-size 4 --games 3 --spawn
+
+With --url local://name and --spawn the server runs in the same process and requests skip
+the socket layer, which measures the game and room logic alone."""
+
+import asyncio
+import json
+import multiprocessing
+from argparse import ArgumentParser
+from collections import defaultdict
+from time import perf_counter, sleep
+from urllib.parse import urlsplit
+
+from ..players.bot import Bot
+from ..utility.identifiers import Identifier, big, equal, small
+from .libnetutil import BaseClient, ConnectionPool
+
+_VERDICTS = {str(big): big, str(small): small, str(equal): equal}
+
+
+class Recorder:
+    """Latency samples per command"""
+
+    def __init__(self):
+        self._samples: dict[str, list[float]] = defaultdict(list)
+
+    async def timed(self, command: str, awaitable):
+        start = perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._samples[command].append(perf_counter() - start)
+
+    def report(self, elapsed: float) -> dict:
+        result = {}
+        for command, samples in sorted(self._samples.items()):
+            samples.sort()
+            def rank(q): return samples[min(
+                len(samples) - 1, int(q * len(samples)))] * 1000
+            result[command] = {"count": len(samples), "rps": len(samples) / elapsed,
+                               "p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99)}
+        total = sum(item["count"] for item in result.values())
+        result["total"] = {"count": total, "rps": total / elapsed}
+        return result
+
+
+class SimulatedPlayer:
+    """A BaseClient whose guesses come from a Bot of the room's level"""
+
+    def __init__(self, name: str, pool: ConnectionPool, level: int, recorder: Recorder):
+        self.name = name
+        self.client = BaseClient(pool)
+        self.level = level
+        self.recorder = recorder
+        self.bot = Bot(name, level)
+
+    def new_game(self, players: int):
+        self.bot = Bot(self.name, self.level)
+        self.bot.tell(maxplayers=players)
+
+    def learn(self, verdicts: list):
+        """Feed one turn of room verdicts to the bot"""
+        for name, value, was in verdicts:
+            player = self.bot if name == self.name else None
+            self.bot.push_put(Identifier(player, _VERDICTS[was], value))
+
+
+async def play_room(players: list[SimulatedPlayer], level: int, bots: int, games: int, recorder: Recorder):
+    owner, guests = players[0], players[1:]
+    room = await recorder.timed("make_room", owner.client.do_make_room(Level=level, Bots=bots))
+    await asyncio.gather(*(recorder.timed("join_room", guest.client.do_join_room(room["RoomID"]))
+                           for guest in guests))
+    for _ in range(games):
+        for player in players:
+            player.new_game(len(players) + bots)
+        running = True
+        while running:
+            await asyncio.gather(*(recorder.timed("guess", player.client.do_guess(player.bot.get()))
+                                   for player in players))
+            infos = await asyncio.gather(*(recorder.timed("get_room", player.client.do_get_info("room"))
+                                           for player in players))
+            for player, info in zip(players, infos):
+                player.learn(info["Verdicts"])
+            running = infos[0]["Running"]
+    for guest in guests:
+        await recorder.timed("exit_room", guest.client.do_exit_room())
+    await recorder.timed("exit_room", owner.client.do_exit_room())
+
+
+async def run(url: str, players: int, room_size: int, level: int, bots: int, games: int, pool_size: int) -> dict:
+    recorder = Recorder()
+    pool = ConnectionPool(url, pool_size)
+    simulated = [SimulatedPlayer(f"load-{index}", pool, level, recorder)
+                 for index in range(players)]
+    start = perf_counter()
+    await asyncio.gather(*(recorder.timed("connect", player.client.do_connect(player.name, player.name))
+                           for player in simulated))
+    await asyncio.gather(*(play_room(simulated[index:index + room_size], level, bots, games, recorder)
+                           for index in range(0, players, room_size)))
+    await asyncio.gather(*(recorder.timed("logout", player.client.do_logout())
+                           for player in simulated))
+    elapsed = perf_counter() - start
+    pool.close()
+    return recorder.report(elapsed)
+
+
+async def _listen(url: str):
+    from .server import RoomServer
+    location = urlsplit(url)
+    server = RoomServer("GTRNv2-loadgen")
+    if location.netloc == '':
+        listener = await server.start_unix(location.path)
+    else:
+        listener = await server.start(location.hostname, location.port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def _serve(url: str):
+    try:
+        asyncio.run(_listen(url))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="python -m packs.network.loadgen",
+                            description="Play simulated games against a GTRNv2 room server.")
+    parser.add_argument("--url", default="socket://127.0.0.1:7500")
+    parser.add_argument("--players", type=int, default=100)
+    parser.add_argument("--room-size", type=int, default=4)
+    parser.add_argument("--level", type=int, default=2)
+    parser.add_argument("--bots", type=int, default=0,
+                        help="Server-side bots per room")
+    parser.add_argument("--games", type=int, default=1,
+                        help="Games per room")
+    parser.add_argument("--pool", type=int, default=8,
+                        help="Connections shared by all players")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Start a local RoomServer process on --url first")
+    parser.add_argument("--output", help="Also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn and args.url.startswith("local://"):
+        from .server import RoomServer
+        RoomServer("GTRNv2-loadgen").start_local(urlsplit(args.url).netloc)
+    elif args.spawn:
+        server = multiprocessing.Process(
+            target=_serve, args=(args.url,), daemon=True)
+        server.start()
+        sleep(1)
+    try:
+        report = asyncio.run(run(args.url, args.players, args.room_size,
+                                 args.level, args.bots, args.games, args.pool))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+
+    print(f"{'command':<12} {'count':>8} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for command, item in report.items():
+        if command == "total":
+            continue
+        print(f"{command:<12} {item['count']:>8} {item['rps']:>10.0f} "
+              f"{item['p50']:>9.2f} {item['p95']:>9.2f} {item['p99']:>9.2f}")
+    print(f"{'total':<12} {report['total']['count']:>8} {report['total']['rps']:>10.0f}")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
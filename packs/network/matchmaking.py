@@ -0,0 +1,143 @@
+"""Matchmaking queue
+
+Waiting players are bucketed by the level they asked for, and every bucket keeps its tickets
+in a RankTree ordered by rating, so adding, removing and finding the closest-rated players
+around a ticket cost O(log n). A ticket accepts opponents within its search window, which
+starts at `window` rating points and widens by `widen` points per second of waiting. Newly
+added tickets are matched at once; waiting ones are retried in turn on a timer, a bounded
+number per tick."""
+
+import asyncio
+from collections import OrderedDict
+from itertools import count, islice
+from time import monotonic
+from typing import Any, Callable
+
+from ..databases.leaderboard import RankTree
+
+
+class Ticket:
+    """A player waiting in the queue. payload is whatever the owner of the queue needs back."""
+    __slots__ = ('key', 'level', 'rating', 'payload', 'since', 'seq')
+
+    def __init__(self, key: str, level: int, rating: float, payload: Any = None):
+        self.key = key
+        self.level = level
+        self.rating = rating
+        self.payload = payload
+        self.since = monotonic()
+        self.seq = 0
+
+    def __repr__(self):
+        return f"Ticket({self.key}, L{self.level}, {self.rating:.0f})"
+
+
+class MatchQueue:
+    """Skill and level bucketed matchmaking into groups of room_size tickets.
+
+    on_match(tickets) is called with every group formed, lowest rating first."""
+
+    def __init__(self, room_size: int = 2, *, window: float = 100, widen: float = 50, max_window: float = 1000,
+                 interval: float = 0.5, budget: int = 256, on_match: Callable[[list[Ticket]], None] | None = None):
+        self._size = room_size
+        self._window = window
+        self._widen = widen
+        self._max_window = max_window
+        self._interval = interval
+        self._budget = budget
+        self._on_match = on_match
+        self._buckets: dict[int, tuple[RankTree, dict[int, Ticket]]] = {}
+        self._tickets: OrderedDict[str, Ticket] = OrderedDict()
+        self._seq = count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def __contains__(self, key: str):
+        return key in self._tickets
+
+    def window(self, ticket: Ticket, now: float | None = None) -> float:
+        waited = (monotonic() if now is None else now) - ticket.since
+        return min(self._window + self._widen * waited, self._max_window)
+
+    def add(self, ticket: Ticket) -> list[Ticket] | None:
+        """Queue a ticket (replacing an older one with the same key). Returns its group when
+        one could be formed right away."""
+        self.discard(ticket.key)
+        ticket.seq = next(self._seq)
+        tree, tickets = self._buckets.setdefault(ticket.level, (RankTree(), {}))
+        tree.insert((ticket.rating, ticket.seq))
+        tickets[ticket.seq] = ticket
+        self._tickets[ticket.key] = ticket
+        group = self._match(ticket, monotonic())
+        if self._tickets:
+            self._arm()
+        return group
+
+    def discard(self, key: str) -> Ticket | None:
+        ticket = self._tickets.pop(key, None)
+        if ticket is not None:
+            tree, tickets = self._buckets[ticket.level]
+            tree.remove((ticket.rating, ticket.seq))
+            del tickets[ticket.seq]
+            if not tickets:
+                del self._buckets[ticket.level]
+        return ticket
+
+    def _match(self, ticket: Ticket, now: float) -> list[Ticket] | None:
+        """Best group of consecutive ratings around ticket that fits every member's window"""
+        tree, tickets = self._buckets[ticket.level]
+        if len(tree) < self._size:
+            return None
+        index = tree.rank((ticket.rating, ticket.seq))
+        best, spread = None, None
+        for start in range(max(index - self._size + 1, 0), min(index, len(tree) - self._size) + 1):
+            group = [tickets[tree.select(position)[1]]
+                     for position in range(start, start + self._size)]
+            width = group[-1].rating - group[0].rating
+            if (spread is None or width < spread) and all(width <= self.window(member, now) for member in group):
+                best, spread = group, width
+        if best is None:
+            return None
+        for member in best:
+            self.discard(member.key)
+        if self._on_match is not None:
+            self._on_match(best)
+        return best
+
+    def poll(self) -> list[list[Ticket]]:
+        """Retry up to budget waiting tickets with their widened windows. Tickets are retried
+        in turn: one that still finds no group goes to the back of the line."""
+        now = monotonic()
+        groups = []
+        for ticket in list(islice(self._tickets.values(), self._budget)):
+            if ticket.key not in self._tickets:
+                continue
+            group = self._match(ticket, now)
+            if group is not None:
+                groups.append(group)
+            else:
+                self._tickets.move_to_end(ticket.key)
+        return groups
+
+    def _arm(self):
+        if self._timer is not None or self._on_match is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Without an event loop tickets are only retried by calling poll().
+            return
+        self._timer = loop.call_later(self._interval, self._tick)
+
+    def _tick(self):
+        self._timer = None
+        self.poll()
+        if self._tickets:
+            self._arm()
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
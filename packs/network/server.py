@@ -0,0 +1,1211 @@
+"""Room server
+
+asyncio implementation of the command set designed in libnetutil. Every connection is a
+buffered protocol on one event loop speaking length-prefixed frames, and every room owns its
+own RoomGame, so thousands of sessions and rooms can share a single process without threads.
+
+    python -m packs.network.server --host 127.0.0.1 --port 7500
+
+Besides the designed commands, a guess is submitted with:
+    Push Guess[Value] to Room[RID] as self[Username:SessionKey]
+A match starts on the first guess and a turn is played once every member has guessed, or
+when the turn's deadline passes (members who missed it are handled by the missing policy).
+
+Clients on the same host can skip TCP through a Unix socket (start_unix, socket:///path),
+and clients in the same process, such as simulated players, can skip sockets altogether
+through start_local (local://name), which hands requests and replies over as objects.
+
+Broadcast mode (any logged-in user may spectate):
+    Subscribe self[Username:SessionKey] to Room[RID]      (REQUEST_SUBSCRIBE)
+    Unsubscribe self[Username:SessionKey] from Room[RID]  (REQUEST_DONE)
+Room state is versioned. A request that reads it (Take data of Room[RID], Push Guess[...])
+may end with `since Version[N]`; the reply then only carries the changes made after
+version N, as {"Version": V, "Since": N, "Changes": [{changed keys}, ...]}, unless N is
+too old to be covered, in which case the full room is sent as usual.
+
+Every played turn is then pushed as a REQUEST_SUBSCRIBE frame with request ID 0, and a
+REQUEST_DONE frame is pushed when the room is removed.
+
+Matchmaking (players of the same level are grouped by rating into a new room):
+    Push self[Username:SessionKey] to Queue[Level]
+    Disconnect self[Username:SessionKey] from Queue[Level]
+The request is answered with WAITING; once a group is formed, every member gets a GOOD
+frame "Found Room[RID] for Ticket[Username]" with request ID 0 and the room as body.
+
+Leaderboard (Elo ratings from the recorded matches, see packs.databases.leaderboard):
+    Take Top[K] as self[Username:SessionKey]
+    Take Rank of self[Username:SessionKey] with Around[Radius]
+
+Replays (with replay_path, every match is recorded turn by turn on disk):
+    Replay Match[MID] to self[Username:SessionKey] at Speed[TurnsPerSecond]
+The reply carries the match header; its turns then follow as REQUEST_SUBSCRIBE frames
+"Turns of Match[MID]" with a JSON array of turn records (one turn per frame at a speed,
+chunks of REPLAY_CHUNK turns with Speed[0]), read from disk as they are sent. A match still
+being played is followed live, and a REQUEST_DONE frame ends the replay.
+
+Load shedding: every connection and every room has a token bucket, and a request that finds
+its bucket empty is answered with OVERFLOW without being served. A connection whose unsent
+replies exceed its send queue gets OVERFLOW for everything it sends until the client catches
+up, so one flooding or stalled client only ever slows down itself.
+
+Checkpoints (with checkpoint_path, see packs.game.checkpoint): every running match is
+snapshotted after each turn, and a restarted server resumes the rooms whose owner still has
+a session (so together with session_path), exactly where their last turn left them."""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import math
+import os
+import re
+import secrets
+from argparse import ArgumentParser
+from collections import deque
+from base64 import b64decode, urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as B64Error
+from itertools import count
+from time import time
+from typing import NamedTuple
+from uuid import UUID
+
+from ..config import GameConfig
+from ..databases.game import GameDB
+from ..databases.leaderboard import Leaderboard, Standing
+from ..databases.replay import ReplayStore
+from ..game import BaseGame, checkpoint
+from ..game.manager import GameManager
+from ..game.room import MissingPolicy, RoomGame
+from ..game.scheduler import TurnScheduler
+from ..players.bot import Bot
+from ..players.remote import RemotePlayer
+from ..utility import default_uid
+from ..utility.identifiers import big, small
+from .broadcast import Channel, Subscriber
+from .errors import RequestError
+from .libnetutil import (FrameDecoder, FrameError, StatusContent, StatusENUM,
+                         encode_frame, parse_command, serve_local, stop_local)
+from .matchmaking import MatchQueue, Ticket
+from .sessions import Session, SessionStore
+from .shard import Shard
+from .throttle import TokenBucket
+
+Reply = tuple[StatusContent, str, str]
+
+# Room changes kept for `since Version[N]` requests
+ROOM_CHANGES = 64
+# Turns per replay frame when replaying at full speed
+REPLAY_CHUNK = 64
+# Recorded matches between two leaderboard checkpoints
+CHECKPOINT_EVERY = 1000
+# Most standings sent in one reply
+MAX_STANDINGS = 100
+# Integer fields: ASCII digits only (str.isnumeric() also passes '½' and '²')
+_INTEGER = re.compile(r"-?[0-9]{1,40}")
+# Requests naming an account (connect and sign-in hash its password)
+_ACCOUNT = re.compile(r"\ban\[", re.IGNORECASE)
+
+
+class Account(NamedTuple):
+    uid: str
+    salt: bytes
+    digest: bytes
+
+
+class Room:
+    """A room, its members and the RoomGame they are playing"""
+
+    def __init__(self, rid: int, owner: Session, level: int = 2, bots: int = 0, invites: tuple[str, ...] = ()):
+        self.rid = rid
+        self.owner = owner
+        self.level = level
+        self.bots = bots
+        self.invites = invites
+        self.members: dict[str, Session] = {}
+        self.game: RoomGame | None = None
+        self.channel = Channel(rid)
+        self.bucket: TokenBucket | None = None
+        self.match: int | None = None
+        self.version = 0
+        self.bounds = list(reversed(BaseGame.level[level]))
+        self._changes: deque[tuple[int, str]] = deque(maxlen=ROOM_CHANGES)
+        self._remotes: dict[str, RemotePlayer] = {}
+
+    @property
+    def running(self):
+        return self.game is not None and self.game.isRunning
+
+    def new_match(self, match: int, game: RoomGame):
+        """Start a new match of game (a fresh RoomGame) with the current members"""
+        self.match = match
+        self.game = game
+        self._remotes = {name: RemotePlayer(name, session.uid)
+                         for name, session in self.members.items()}
+        for player in self._remotes.values():
+            self.game.register_player(player)
+        for index in range(self.bots):
+            self.game.register_player(Bot(f"Bot-{index}", self.level))
+        self.game.run()
+        self.bounds = list(reversed(BaseGame.level[self.level]))
+        self.changed("Match", "Running", "Turn",
+                     "Verdicts", "Winners", "Bounds")
+
+    def played(self, verdicts: list):
+        """Narrow the known bounds of the mystery number with one turn of verdicts"""
+        for verdict in verdicts:
+            if verdict.was is big:
+                self.bounds[1] = min(self.bounds[1], verdict.value - 1)
+            elif verdict.was is small:
+                self.bounds[0] = max(self.bounds[0], verdict.value + 1)
+            else:
+                self.bounds = [verdict.value, verdict.value]
+        self.changed("Running", "Turn", "Verdicts", "Winners", "Bounds")
+
+    def changed(self, *keys: str):
+        """Start a new version in which keys of info() changed"""
+        self.version += 1
+        info = self.info()
+        delta = {key: info[key] for key in keys}
+        delta["Version"] = self.version
+        self._changes.append((self.version, json.dumps(delta)))
+
+    def data(self, since: str | tuple[str, ...] | None) -> str:
+        """JSON of the changes after version since, or of the whole room when they are not kept"""
+        if isinstance(since, str) and _INTEGER.fullmatch(since) and since[0] != '-':
+            version = int(since)
+            changes = self._changes
+            if version == self.version or (changes and changes[0][0] <= version + 1 and version < self.version):
+                return '{"Version": %d, "Since": %d, "Changes": [%s]}' % (
+                    self.version, version, ', '.join(delta for number, delta in changes if number > version))
+        return json.dumps(self.info())
+
+    def resume(self, match: int, game: RoomGame, version: int, bounds: list[int]):
+        """Continue a match restored from a checkpoint"""
+        self.match = match
+        self.game = game
+        self._remotes = {player.name: player for player in game.Players
+                         if isinstance(player, RemotePlayer)}
+        self.version = version
+        self.bounds = bounds
+
+    def snapshot(self) -> bytes:
+        """Checkpoint of the room and its match"""
+        return json.dumps({
+            "RoomID": self.rid, "Owner": self.owner.key, "Level": self.level, "Bots": self.bots,
+            "Invites": self.invites, "Members": [session.key for session in self.members.values()],
+            "Match": self.match, "Version": self.version, "Bounds": self.bounds,
+        }).encode('utf-8') + b'\n' + checkpoint.dump(self.game)
+
+    def submit(self, session: Session, value: int):
+        self._remotes[session.username].submit(value)
+
+    def info(self) -> dict:
+        game = self.game
+        return {
+            "RoomID": self.rid,
+            "Match": self.match,
+            "Owner": self.owner.username,
+            "RoomLn": len(self.members),
+            "Level": self.level,
+            "Bots": self.bots,
+            "Players": list(self.members),
+            "Running": self.running,
+            "Turn": game.Turn if game else 0,
+            "Verdicts": [[verdict.player.name, verdict.value, str(verdict.was)]
+                         for verdict in game.Verdicts] if game else [],
+            "Winners": [player.name for player in game.Winners] if game else [],
+            "Bounds": self.bounds,
+            "Version": self.version,
+        }
+
+
+def _encode(value: str) -> str:
+    return urlsafe_b64encode(value.encode('utf-8')).decode()
+
+
+def _decode(value: str) -> str:
+    try:
+        return b64decode(value, b'-_').decode('utf-8')
+    except (B64Error, UnicodeDecodeError, ValueError, TypeError):
+        raise RequestError(StatusENUM.REQ_SYNTAX_ERROR.value,
+                           "Credentials must be url-safe base64.") from None
+
+
+def _integer(value: str | tuple[str, ...] | None, name: str, negative: bool = False) -> int:
+    """Integer field, or a syntax error naming it"""
+    if not isinstance(value, str) or not _INTEGER.fullmatch(value) or (value[0] == '-' and not negative):
+        raise RequestError(StatusENUM.REQ_SYNTAX_ERROR.value,
+                           f"{name} must be an integer.")
+    return int(value)
+
+
+def _raw_key(key: str) -> bytes | None:
+    """Decoded session key, None when it is not one"""
+    try:
+        raw = urlsafe_b64decode(key)
+    except (B64Error, ValueError):
+        return None
+    return raw if len(raw) == 40 else None
+
+
+def _expiry(key: str) -> int | None:
+    """Unix time a session key expires at (its signature is not checked)"""
+    raw = _raw_key(key)
+    return None if raw is None else int.from_bytes(raw[24:28], 'big')
+
+
+def _bucket(rate: float | None) -> TokenBucket | None:
+    return None if rate is None else TokenBucket(rate, 2 * rate)
+
+
+def _standings(standings: list[Standing]) -> str:
+    return json.dumps([{"Rank": standing.rank, "Username": standing.name, "UserID": standing.uid,
+                        "Rating": round(standing.rating, 1), "Wins": standing.wins, "Losses": standing.losses}
+                       for standing in standings])
+
+
+class RoomServer:
+    """Sessions and rooms of one server process.
+
+    Session keys are signed with secret; workers of one cluster share it (and their Shard)
+    so a key issued by one worker is accepted by all of them. Sessions expire after
+    session_ttl seconds without use and keys carry their own expiry, session_lifetime
+    seconds after they were issued. A key that was logged out, deleted or expired is
+    refused until then (a sibling worker only refuses the revocations it knows of). With
+    session_path sessions and revocations survive restarts. Accounts always do: their
+    password salt and digest are kept in the GameDB with the user.
+
+    request_rate and room_rate are the requests per second allowed per connection and per
+    room (bursts of twice as many pass; None disables the limit), and send_queue is the
+    most bytes of replies waiting for one client before its requests are shed.
+
+    A turn closes turn_timeout seconds after its first guess (None: only once everyone
+    has guessed) and players who missed it are handled by the missing policy. With
+    replay_path, matches are recorded there and can be replayed. With checkpoint_path,
+    running matches are snapshotted every turn and resumed on restart. Matchmaking forms
+    rooms of match_size players."""
+
+    def __init__(self, name: str = "GTRNv2", *, secret: bytes | None = None, shard: Shard | None = None,
+                 session_ttl: float = 3600, session_lifetime: float = 86400, session_capacity: int = 100_000,
+                 session_path: str | None = None,
+                 request_rate: float | None = 1000, room_rate: float | None = 500, send_queue: int = 1024 * 1024,
+                 turn_timeout: float | None = 30, missing: MissingPolicy = "skip",
+                 replay_path: str | None = None, checkpoint_path: str | None = None, match_size: int = 2):
+        self._name = name
+        self._request_rate = request_rate
+        self._room_rate = room_rate
+        self._send_queue = send_queue
+        self._secret = secret or secrets.token_bytes(32)
+        self._shard = shard
+        self._session_path = session_path
+        self._session_lifetime = session_lifetime
+        self._database = GameDB()
+        # Accounts live on the worker owning their username (see handle)
+        self._accounts: dict[str, Account] = {
+            user.username: Account(user.uid, salt, digest)
+            for user, salt, digest in self._database.get_credentials()
+            if shard is None or shard.owns(f"user:{user.username}")}
+        self._sessions = SessionStore(
+            session_ttl, session_capacity, on_expire=self._expired)
+        if session_path is not None:
+            self._sessions.load(session_path)
+            for session in self._sessions:
+                if _expiry(session.key) is None or not self._known(session.username):
+                    self._sessions.discard(session.key)
+        self._rooms: dict[int, Room] = {}
+        self._games = GameManager()
+        self._turns = TurnScheduler(
+            turn_timeout, missing, on_turn=self._turn_played)
+        self._replays = ReplayStore(replay_path) if replay_path else None
+        self._live: set[int] = set()
+        self._followers: dict[int, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()  # Replay streams and password hashing
+        self._room_ids = count(1)
+        # Match IDs start at the time in ms; worker i of a shard only takes those equal to i
+        # modulo the number of workers, so IDs are unique in the cluster and name their worker
+        step = len(shard.ring) if shard is not None else 1
+        self._history_ids = count(
+            int(time() * 1000) * step + (shard.index if shard is not None else 0), step)
+        self._leaderboard = Leaderboard(self._database)
+        self._leaderboard.load()
+        # Every worker keeps the whole board (see _standings_now); one of them checkpoints it
+        self._keeps_standings = shard is None or shard.owns("leaderboard")
+        self._unsaved = 0
+        self._queue = MatchQueue(match_size, on_match=self._matched)
+        self._servers: list[asyncio.AbstractServer] = []
+        self._local: list[str] = []
+        self._checkpoint_path = checkpoint_path
+        if checkpoint_path is not None:
+            os.makedirs(checkpoint_path, 0o700, True)
+            self._resume()
+
+    # =============================================================
+    #                          Dispatching
+    # =============================================================
+
+    def handle(self, code: int, summary: str, body: str, connection: Subscriber | None = None,
+               hashed: tuple[bytes, bytes] | None = None) -> Reply:
+        """Serve one request and return (status, summary, body) of the response.
+        connection is the subscriber used by broadcast requests, hashed the (salt, digest)
+        of a connect or sign-in password already hashed by handle_async."""
+        verb, target, fields = parse_command(summary)
+        try:
+            account = fields.get('an')
+            if account is not None:
+                # Accounts live on the worker owning their username.
+                self._route(
+                    f"user:{_decode(account[0] if isinstance(account, tuple) else account)}")
+            if verb == "connect" and 'an' in fields:
+                return self.do_connect(fields, hashed)
+            if verb == "push" and target == "data":
+                return self.do_sign_in(fields, hashed)
+            if verb == "push" and target == "room":
+                return self.do_make_room(fields, body)
+            if verb == "push" and 'queue' in fields:
+                return self.do_enqueue(fields, connection)
+            if verb == "disconnect" and 'queue' in fields:
+                return self.do_dequeue(fields)
+            if verb == "push" and 'guess' in fields:
+                return self.do_guess(fields)
+            if verb == "push" and 'room' in fields:
+                return self.do_join_room(fields)
+            if verb in ("delete", "remove") and target == "data":
+                return self.do_delete_account(fields)
+            if verb in ("delete", "remove") and 'room' in fields:
+                return self.do_delete_room(fields)
+            if verb == "disconnect" and 'room' in fields:
+                return self.do_exit_room(fields)
+            if verb == "disconnect":
+                return self.do_logout(fields)
+            if verb == "take" and 'room' in fields:
+                return self.do_get_room(fields)
+            if verb == "take" and 'top' in fields:
+                return self.do_get_top(fields)
+            if verb == "take" and target == "rank":
+                return self.do_get_rank(fields)
+            if verb == "take":
+                return self.do_get_account(fields)
+            if verb == "subscribe":
+                return self.do_subscribe(fields, connection)
+            if verb == "unsubscribe":
+                return self.do_unsubscribe(fields, connection)
+            if verb == "replay":
+                return self.do_replay(fields, connection)
+        except RequestError as exc:
+            return exc.status, exc.message, exc.body
+        except Exception as exc:
+            # A bug costs this request, not the connection and every request queued on it.
+            # (The summary is not logged: it carries session keys.)
+            print(f"[GTRNv2] {type(exc).__name__} while serving {verb} {target}: {exc}")
+            return StatusENUM.INTERNAL_SERVER_ERROR.value, StatusENUM.INTERNAL_SERVER_ERROR.value.description, ''
+        return StatusENUM.REQ_SYNTAX_ERROR.value, f"Unknown command: {verb}", ''
+
+    # =============================================================
+    #                        Authentication
+    # =============================================================
+
+    @staticmethod
+    def _hash(password: str, salt: bytes):
+        return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 10_000)
+
+    def _password(self, summary: str) -> tuple[str, bytes] | None:
+        """(password, salt) to hash for a connect or sign-in request served here, None for
+        any other request (or one handle() refuses before hashing anything)"""
+        if _ACCOUNT.search(summary) is None:
+            return None
+        verb, target, fields = parse_command(summary)
+        if 'an' not in fields or not (verb == "connect" or (verb == "push" and target == "data" and 'ap' in fields)):
+            return None
+        try:
+            username, password = _decode(fields['an']), _decode(fields.get('ap', ''))
+        except RequestError:
+            return None
+        if self._shard is not None and not self._shard.owns(f"user:{username}"):
+            return None
+        account = self._accounts.get(username)
+        if verb == "connect":
+            return (password, account.salt) if account is not None else None
+        return (password, secrets.token_bytes(16)) if account is None else None
+
+    async def handle_async(self, code: int, summary: str, body: str, connection: Subscriber | None = None) -> Reply:
+        """handle(), with the password of a connect or sign-in request hashed on the default
+        executor first: 10,000 rounds of PBKDF2 on the loop would hold up every connection"""
+        password = self._password(summary)
+        if password is None:
+            return self.handle(code, summary, body, connection)
+        digest = await asyncio.get_running_loop().run_in_executor(None, self._hash, *password)
+        return self.handle(code, summary, body, connection, (password[1], digest))
+
+    def _background(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _sign(self, payload: bytes, username: str) -> bytes:
+        return hmac.digest(self._secret, payload + username.encode('utf-8'), 'sha256')[:12]
+
+    def _open_session(self, username: str) -> Reply:
+        # Key: user ID (16 bytes), nonce (8 bytes), expiry (4 bytes, Unix time), signature (12 bytes)
+        payload = (UUID(self._accounts[username].uid).bytes + secrets.token_bytes(8)
+                   + int(time() + self._session_lifetime).to_bytes(4, 'big'))
+        key = urlsafe_b64encode(
+            payload + self._sign(payload, username)).decode()
+        self._sessions.add(
+            Session(username, self._accounts[username].uid, key))
+        return StatusENUM.CONNECT_SUCCESS.value, f"Welcome to {self._name}!", f"You[{key}]"
+
+    def _adopt(self, username: str, key: str) -> Session | None:
+        """Accept a session opened by another worker of the cluster, unless it expired or
+        was revoked (or its account is ours and no longer exists)"""
+        raw = _raw_key(key)
+        if raw is None or not hmac.compare_digest(raw[28:], self._sign(raw[:28], username)):
+            return None
+        if int.from_bytes(raw[24:28], 'big') <= time() or self._sessions.revoked(key):
+            return None
+        if not self._known(username):
+            return None
+        session = Session(username, str(UUID(bytes=raw[:16])), key)
+        self._sessions.add(session)
+        return session
+
+    def _known(self, username: str) -> bool:
+        """Whether username has an account, as far as this worker can tell"""
+        return username in self._accounts or (self._shard is not None and not self._shard.owns(f"user:{username}"))
+
+    def _revoke(self, session: Session):
+        """End a session for good: its key is not adopted again before it expires"""
+        self._sessions.revoke(session.key, _expiry(session.key) or 0)
+
+    def _expired(self, session: Session):
+        self._revoke(session)
+        self._leave(session)
+
+    def _authenticate(self, value: str | tuple[str, ...] | None) -> Session:
+        """Resolve `SessionKey` or `Username:SessionKey` into its session"""
+        if isinstance(value, tuple):
+            if len(value) != 2:
+                raise RequestError(StatusENUM.REQ_SYNTAX_ERROR.value)
+            username, key = _decode(value[0]), value[1]
+        else:
+            username, key = None, value
+        session = self._sessions.get(key) if isinstance(key, str) else None
+        if session is None and username is not None:
+            session = self._adopt(username, key)
+        if session is None or (username is not None and session.username != username):
+            raise RequestError(StatusENUM.BLOCKED.value)
+        if (_expiry(session.key) or 0) <= time():
+            self._leave(session)
+            self._revoke(session)
+            raise RequestError(StatusENUM.BLOCKED.value, "Session expired.")
+        return session
+
+    def _route(self, key: str | int):
+        """Refuse keys owned by another worker, pointing the client there"""
+        if self._shard is not None and not self._shard.owns(key):
+            address = self._shard.address(key)
+            raise RequestError(StatusENUM.MOVED.value,
+                               f"Moved to Worker[{address.partition('://')[2]}]", address)
+
+    def _route_match(self, match: int):
+        """Refuse matches played on another worker (see _history_ids)"""
+        if self._shard is not None and match % len(self._shard.ring) != self._shard.index:
+            address = self._shard.addresses[match % len(self._shard.ring)]
+            raise RequestError(StatusENUM.MOVED.value,
+                               f"Moved to Worker[{address.partition('://')[2]}]", address)
+
+    def _room(self, rid: str | tuple[str, ...] | None, throttle: bool = True) -> Room:
+        """Room of rid. With throttle, the request is charged to the room's bucket."""
+        rid = _integer(rid, "Room ID")
+        self._route(rid)
+        room = self._rooms.get(rid)
+        if room is None:
+            raise RequestError(StatusENUM.NOT_EXISTS.value, "No such room.")
+        if throttle and room.bucket is not None and not room.bucket.take():
+            raise RequestError(StatusENUM.OVERFLOW.value,
+                               f"Room[{room.rid}] is too busy.")
+        return room
+
+    # =============================================================
+    #                            Commands
+    # =============================================================
+
+    def do_connect(self, fields: dict, hashed: tuple[bytes, bytes] | None = None) -> Reply:
+        """Connect with AN[Username] and AP[Password]"""
+        username, password = _decode(fields['an']), _decode(fields.get('ap', ''))
+        account = self._accounts.get(username)
+        if account is None:
+            return StatusENUM.USER_NOT_FOUND.value, "No such user.", ''
+        if hashed is None or hashed[0] != account.salt:
+            # Not hashed beforehand, or the account was made again meanwhile
+            hashed = account.salt, self._hash(password, account.salt)
+        if not secrets.compare_digest(account.digest, hashed[1]):
+            return StatusENUM.BLOCKED.value, "Invalid password.", ''
+        return self._open_session(username)
+
+    def do_sign_in(self, fields: dict, hashed: tuple[bytes, bytes] | None = None) -> Reply:
+        """Push Data as AN[Username] and AP[Password] then Connect"""
+        if 'an' not in fields or 'ap' not in fields:
+            raise RequestError(StatusENUM.REQ_SYNTAX_ERROR.value)
+        username, password = _decode(fields['an']), _decode(fields['ap'])
+        if username in self._accounts:
+            return StatusENUM.ALREADY_EXISTS.value, "Username is taken.", ''
+        if hashed is None:
+            salt = secrets.token_bytes(16)
+            hashed = salt, self._hash(password, salt)
+        uid = str(self._database.add_user(username))
+        account = self._accounts[username] = Account(uid, *hashed)
+        self._database.set_credentials(uid, account.salt, account.digest)
+        return self._open_session(username)
+
+    def do_delete_account(self, fields: dict) -> Reply:
+        """Delete Data as AN[Username:SessionKey]"""
+        session = self._authenticate(fields.get('an'))
+        self._leave(session)
+        self._revoke(session)
+        self._accounts.pop(session.username, None)
+        self._database.remove_user(session.uid)
+        return StatusENUM.DELETED.value, "Thank you for playing!", f"You[{session.username}]"
+
+    def do_logout(self, fields: dict) -> Reply:
+        """Disconnect self[Username:SessionKey]"""
+        session = self._authenticate(fields.get('self'))
+        self._leave(session)
+        self._revoke(session)
+        return StatusENUM.CONNECT_LOGOUT.value, StatusENUM.CONNECT_LOGOUT.value.description, ''
+
+    def do_make_room(self, fields: dict, body: str) -> Reply:
+        """Push room as Owner[SessionKey] with a JSON body (Invites, Level, Bots)"""
+        owner = self._authenticate(fields.get('owner'))
+        if owner.room is not None:
+            raise RequestError(StatusENUM.ALREADY_EXISTS.value,
+                               "Leave your current room first.")
+        try:
+            contents = json.loads(body) if body else {}
+            level = int(contents.get("Level", contents.get("LevelRoom", 2)))
+            bots = int(contents.get("Bots", contents.get("IncludeBots", 0)))
+            invites = contents.get(
+                "Invites", contents.get("IncludePlayerSharedID", []))
+            invites = tuple(invites.split(', ') if isinstance(
+                invites, str) else invites)
+        except (ValueError, TypeError, AttributeError):
+            raise RequestError(StatusENUM.REQ_SYNTAX_ERROR.value,
+                               "Invalid room header.") from None
+        if level not in BaseGame.level or bots < 0:
+            raise RequestError(StatusENUM.REQ_SYNTAX_ERROR.value,
+                               "Invalid level or bot count.")
+        room = Room(self._new_room_id(), owner, level, bots, invites)
+        room.bucket = _bucket(self._room_rate)
+        self._rooms[room.rid] = room
+        self._enter(owner, room)
+        return StatusENUM.GOOD.value, f"Created Room[{room.rid}] with Owner[{owner.uid}]", json.dumps(room.info())
+
+    def do_join_room(self, fields: dict) -> Reply:
+        """Push self[Username:SessionKey] to Room[RID]"""
+        session = self._authenticate(fields.get('self'))
+        room = self._room(fields.get('room'))
+        if session.room is room:
+            return StatusENUM.EXISTS.value, f"Pushed You to Room[{room.rid}]", json.dumps(room.info())
+        if session.room is not None:
+            raise RequestError(StatusENUM.ALREADY_EXISTS.value,
+                               "Leave your current room first.")
+        if room.invites and session.username not in room.invites:
+            raise RequestError(StatusENUM.PERMISSION_DENIED.value,
+                               "You are not invited.")
+        if room.running:
+            raise RequestError(StatusENUM.PERMISSION_DENIED.value,
+                               "The match is already running.")
+        self._enter(session, room)
+        return StatusENUM.GOOD.value, f"Pushed You to Room[{room.rid}]", json.dumps(room.info())
+
+    def do_exit_room(self, fields: dict) -> Reply:
+        """Disconnect self[Username:SessionKey] from Room[RID]"""
+        session = self._authenticate(fields.get('self'))
+        room = self._room(fields.get('room'), throttle=False)
+        if session.room is not room:
+            raise RequestError(StatusENUM.NOT_EXISTS.value,
+                               "You are not in that room.")
+        self._leave(session)
+        return StatusENUM.DELETED.value, f"Removed You from Room[{room.rid}]", ''
+
+    def do_delete_room(self, fields: dict) -> Reply:
+        """Delete Room[RID] as Owner[Username:SessionKey]"""
+        session = self._authenticate(fields.get('owner'))
+        room = self._room(fields.get('room'), throttle=False)
+        if room.owner is not session:
+            raise RequestError(StatusENUM.PERMISSION_DENIED.value)
+        self._close(room)
+        return StatusENUM.DELETED.value, f"Removed Room[{room.rid}]", ''
+
+    def do_guess(self, fields: dict) -> Reply:
+        """Push Guess[Value] to Room[RID] as self[Username:SessionKey] (since Version[N])"""
+        session = self._authenticate(fields.get('self'))
+        room = self._room(fields.get('room'))
+        if session.room is not room:
+            raise RequestError(StatusENUM.PERMISSION_DENIED.value,
+                               "You are not in that room.")
+        guess = _integer(fields['guess'], "Guess", negative=True)
+        if not room.running:
+            self._games.retire(room.game)
+            room.new_match(next(self._history_ids),
+                           self._games.create(RoomGame, room.level))
+            self._begin(room)
+            self._checkpoint(room)
+        room.submit(session, guess)
+        game = room.game
+        if self._turns.submitted(room, game) is None:
+            return StatusENUM.WAITING.value, f"Turn {game.Turn + 1} is waiting for other players.", room.data(fields.get('version'))
+        return StatusENUM.GOOD.value, f"Turn {game.Turn} is played.", room.data(fields.get('version'))
+
+    def do_get_room(self, fields: dict) -> Reply:
+        """Take data of Room[RID] and self[Username:SessionKey] (since Version[N])"""
+        session = self._authenticate(fields.get('self'))
+        room = self._room(fields.get('room'))
+        return StatusENUM.GOOD.value, f"Send Data of Room[{room.rid}] to You[{session.uid}]", room.data(fields.get('version'))
+
+    def do_get_account(self, fields: dict) -> Reply:
+        """Take data of self[Username:SessionKey]"""
+        session = self._authenticate(fields.get('self'))
+        return StatusENUM.GOOD.value, f"Send Data of You to AI[{session.uid}]", json.dumps({
+            "Username": session.username,
+            "UserID": session.uid,
+            "RoomID": session.room.rid if session.room else None,
+        })
+
+    def do_enqueue(self, fields: dict, connection: Subscriber | None) -> Reply:
+        """Push self[Username:SessionKey] to Queue[Level]"""
+        session = self._authenticate(fields.get('self'))
+        level = _integer(fields['queue'], "Level")
+        if level not in BaseGame.level:
+            raise RequestError(StatusENUM.REQ_SYNTAX_ERROR.value,
+                               "Invalid level.")
+        self._route(f"queue:{level}")
+        if connection is None:
+            raise RequestError(StatusENUM.PERMISSION_DENIED.value,
+                               "Matchmaking needs a connection.")
+        if session.room is not None:
+            raise RequestError(StatusENUM.ALREADY_EXISTS.value,
+                               "Leave your current room first.")
+        self._queue.add(Ticket(session.key, level, self._standings_now().rating(session.uid),
+                               (session, connection)))
+        return StatusENUM.WAITING.value, f"Pushed You to Queue[{level}]", ''
+
+    def do_dequeue(self, fields: dict) -> Reply:
+        """Disconnect self[Username:SessionKey] from Queue[Level]"""
+        session = self._authenticate(fields.get('self'))
+        if self._queue.discard(session.key) is None:
+            raise RequestError(StatusENUM.NOT_EXISTS.value,
+                               "You are not queued.")
+        return StatusENUM.DELETED.value, f"Removed You from Queue[{fields['queue']}]", ''
+
+    def do_get_top(self, fields: dict) -> Reply:
+        """Take Top[K] as self[Username:SessionKey]"""
+        self._authenticate(fields.get('self'))
+        count = _integer(fields['top'], "Top")
+        standings = self._standings_now().top(min(count, MAX_STANDINGS))
+        return StatusENUM.GOOD.value, f"Send Top[{len(standings)}] to You", _standings(standings)
+
+    def do_get_rank(self, fields: dict) -> Reply:
+        """Take Rank of self[Username:SessionKey] with Around[Radius]"""
+        session = self._authenticate(fields.get('self'))
+        radius = _integer(fields.get('around', '0'), "Around")
+        leaderboard = self._standings_now()
+        rank = leaderboard.rank(session.uid)
+        if rank is None:
+            raise RequestError(StatusENUM.NOT_EXISTS.value,
+                               "You have no recorded match yet.")
+        standings = leaderboard.around(
+            rank, min(radius, MAX_STANDINGS // 2))
+        return StatusENUM.GOOD.value, f"Send Rank[{rank}] to You", _standings(standings)
+
+    def do_subscribe(self, fields: dict, connection: Subscriber | None) -> Reply:
+        """Subscribe self[Username:SessionKey] to Room[RID]"""
+        self._authenticate(fields.get('self'))
+        room = self._room(fields.get('room'))
+        if connection is None:
+            raise RequestError(StatusENUM.PERMISSION_DENIED.value,
+                               "Broadcast needs a connection.")
+        room.channel.add(connection)
+        return StatusENUM.GOOD.value, f"Subscribed You to Room[{room.rid}]", json.dumps(room.info())
+
+    def do_unsubscribe(self, fields: dict, connection: Subscriber | None) -> Reply:
+        """Unsubscribe self[Username:SessionKey] from Room[RID]"""
+        self._authenticate(fields.get('self'))
+        room = self._room(fields.get('room'), throttle=False)
+        if connection is not None:
+            room.channel.discard(connection)
+        return StatusENUM.REQUEST_DONE.value, f"Unsubscribed You from Room[{room.rid}]", ''
+
+    def do_replay(self, fields: dict, connection: Subscriber | None) -> Reply:
+        """Replay Match[MID] to self[Username:SessionKey] at Speed[TurnsPerSecond]"""
+        self._authenticate(fields.get('self'))
+        match, speed = _integer(fields.get('match'), "Match ID"), fields.get('speed', '0')
+        self._route_match(match)
+        try:
+            speed = float(speed)
+        except (TypeError, ValueError):
+            speed = math.nan
+        if not math.isfinite(speed):
+            # nan would end up in asyncio.sleep(1 / speed), inf means no pause at all
+            raise RequestError(StatusENUM.REQ_SYNTAX_ERROR.value,
+                               "Speed must be a finite number.")
+        if self._replays is None or match not in self._replays:
+            raise RequestError(StatusENUM.NOT_EXISTS.value, "No such match.")
+        if connection is None:
+            raise RequestError(StatusENUM.PERMISSION_DENIED.value,
+                               "Replays need a connection.")
+        with self._replays.open(match) as file:
+            header = file.readline().decode('utf-8')
+        self._background(self._stream(connection, match, max(speed, 0)))
+        return StatusENUM.GOOD.value, f"Replaying Match[{match}]", header
+
+    # =============================================================
+    #                            Replays
+    # =============================================================
+
+    def _begin(self, room: Room):
+        if self._replays is None:
+            return
+        self._live.add(room.match)
+        self._replays.begin(room.match, {
+            "RoomID": room.rid, "Level": room.level, "Seed": room.game.Seed, "Started": time(),
+            "Players": [player.name for player in room.game.Players]})
+
+    def _end(self, room: Room, abandoned: bool = False):
+        if self._replays is None or room.match not in self._live:
+            return
+        game = room.game
+        self._replays.end(room.match, {
+            "Winners": [player.name for player in game.Winners], "Mystery": game.Mystery,
+            "Abandoned": abandoned})
+        self._live.discard(room.match)
+        self._wake(room.match)
+
+    def _wake(self, match: int):
+        future = self._followers.pop(match, None)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    def _follow(self, match: int) -> asyncio.Future:
+        """Future resolved when the next record of a live match is written"""
+        future = self._followers.get(match)
+        if future is None:
+            future = self._followers[match] = asyncio.get_running_loop().create_future()
+        return future
+
+    async def _stream(self, connection: Subscriber, match: int, speed: float):
+        """Send the records of a match from disk, a chunk at a time"""
+        size = 1 if speed else REPLAY_CHUNK
+        summary = f"Turns of Match[{match}]"
+        with self._replays.open(match) as file:
+            file.readline()
+            chunk = []
+            while not connection.closed:
+                position = file.tell()
+                line = file.readline()
+                if line and not line.endswith(b'\n'):
+                    # Half written; read it again once it is complete
+                    file.seek(position)
+                    line = b''
+                if line:
+                    chunk.append(line[:-1])
+                    if len(chunk) < size and not line.startswith(b'{"End"'):
+                        continue
+                if chunk:
+                    if connection.paused:
+                        await connection.drained()
+                    connection.write(encode_frame(
+                        StatusENUM.REQUEST_SUBSCRIBE.value.code, summary, b'[' + b', '.join(chunk) + b']'))
+                    if chunk[-1].startswith(b'{"End"'):
+                        break
+                    chunk = []
+                    if speed:
+                        await asyncio.sleep(1 / speed)
+                elif match in self._live:
+                    await self._follow(match)
+                else:
+                    break
+        connection.write(encode_frame(
+            StatusENUM.REQUEST_DONE.value.code, f"Replayed Match[{match}]"))
+
+    # =============================================================
+    #                         Room bookkeeping
+    # =============================================================
+
+    def _turn_played(self, room: Room, game: RoomGame, verdicts: list):
+        """Called by the scheduler after every turn, including the ones closed by a deadline"""
+        room.played(verdicts)
+        if self._replays is not None and room.match in self._live:
+            self._replays.turn(room.match, {
+                "Turn": game.Turn, "Bounds": room.bounds,
+                "Verdicts": [[verdict.player.name, verdict.value, str(verdict.was)] for verdict in verdicts]})
+            self._wake(room.match)
+        if not game.isRunning:
+            try:
+                self._record(room)
+            finally:
+                # Over even when it could not be recorded: close the replay, drop the checkpoint
+                self._end(room)
+                self._forget(room)
+        else:
+            self._checkpoint(room)
+        if room.channel:
+            room.channel.publish(encode_frame(
+                StatusENUM.REQUEST_SUBSCRIBE.value.code, f"Turn {game.Turn} of Room[{room.rid}]",
+                json.dumps(room.info())))
+
+    def _matched(self, tickets: list[Ticket]):
+        """Open a room for a group formed by the matchmaking queue"""
+        owner = tickets[0].payload[0]
+        room = Room(self._new_room_id(), owner, tickets[0].level)
+        room.bucket = _bucket(self._room_rate)
+        self._rooms[room.rid] = room
+        for ticket in tickets:
+            self._enter(ticket.payload[0], room)
+        info = json.dumps(room.info())
+        for ticket in tickets:
+            session, connection = ticket.payload
+            if not connection.closed:
+                connection.write(encode_frame(StatusENUM.GOOD.value.code,
+                                              f"Found Room[{room.rid}] for Ticket[{_encode(session.username)}]", info))
+
+    def _new_room_id(self) -> int:
+        """Next room ID that hashes to this worker"""
+        rid = next(self._room_ids)
+        while self._shard is not None and not self._shard.owns(rid):
+            rid = next(self._room_ids)
+        return rid
+
+    def _enter(self, session: Session, room: Room):
+        self._queue.discard(session.key)
+        room.members[session.username] = session
+        session.room = room
+        room.changed("Players", "RoomLn")
+
+    def _leave(self, session: Session):
+        self._queue.discard(session.key)
+        room = session.room
+        if room is None:
+            return
+        session.room = None
+        del room.members[session.username]
+        if room.owner is session or not room.members:
+            self._close(room)
+        elif room.running:
+            # The match cannot continue without one of its players.
+            self._turns.discard(room)
+            self._end(room, abandoned=True)
+            self._forget(room)
+            self._games.retire(room.game)
+            room.game = None
+            room.changed("Players", "RoomLn", "Running",
+                         "Turn", "Verdicts", "Winners")
+        else:
+            room.changed("Players", "RoomLn")
+
+    def _close(self, room: Room):
+        for member in room.members.values():
+            member.room = None
+        room.members.clear()
+        self._turns.discard(room)
+        if room.game is not None:
+            self._end(room, abandoned=room.running)
+            self._forget(room)
+            self._games.retire(room.game)
+        room.game = None
+        room.channel.close(encode_frame(
+            StatusENUM.REQUEST_DONE.value.code, f"Removed Room[{room.rid}]"))
+        self._rooms.pop(room.rid, None)
+
+    def _record(self, room: Room):
+        """Save a finished match into the history table"""
+        game = room.game
+        players = game.Players
+        uids = [str(getattr(player, '_uid', default_uid))
+                for player in players[:2]]
+        uids.extend([str(default_uid)] * (2 - len(uids)))
+        winners = [players.index(player) + 1 for player in game.Winners]
+        # Players 1 and 2 both guessing it in the same turn is a draw, not a loss for one of them
+        winner = 0 if 1 in winners and 2 in winners else min(winners, default=0)
+        self._database.add_history(
+            room.match, uids[0], uids[1], winner, game.Mystery)
+        self._standings_now()
+
+    def _standings_now(self) -> Leaderboard:
+        """The leaderboard caught up with the history table, so with the matches every worker
+        of the shard recorded. Workers apply them in the same order and agree on the board."""
+        applied = self._leaderboard.refresh()
+        if self._keeps_standings:
+            self._unsaved += applied
+            if self._unsaved >= CHECKPOINT_EVERY:
+                self._leaderboard.checkpoint()
+                self._unsaved = 0
+        return self._leaderboard
+
+    # =============================================================
+    #                          Checkpoints
+    # =============================================================
+
+    def _checkpoint_file(self, rid: int) -> str:
+        return os.path.join(self._checkpoint_path, f"{rid}.gtrc")
+
+    def _checkpoint(self, room: Room):
+        if self._checkpoint_path is None:
+            return
+        path = self._checkpoint_file(room.rid)
+        with open(f"{path}.tmp", 'wb') as file:
+            file.write(room.snapshot())
+        os.replace(f"{path}.tmp", path)
+
+    def _forget(self, room: Room):
+        if self._checkpoint_path is not None:
+            try:
+                os.remove(self._checkpoint_file(room.rid))
+            except FileNotFoundError:
+                pass
+
+    def _resume(self):
+        """Reopen the rooms checkpointed by the last run whose owner is still logged in"""
+        last = 0
+        for entry in os.scandir(self._checkpoint_path):
+            if not entry.name.endswith('.gtrc'):
+                continue
+            with open(entry.path, 'rb') as file:
+                header, _, data = file.read().partition(b'\n')
+            try:
+                meta = json.loads(header)
+                game = checkpoint.load(data, self._database)
+            except (ValueError, checkpoint.CheckpointError):
+                print(f"[GTRNv2] Skipping damaged checkpoint {entry.name}")
+                continue
+            owner = self._sessions.get(meta["Owner"])
+            if owner is None or owner.room is not None:
+                os.remove(entry.path)
+                continue
+            room = Room(meta["RoomID"], owner, meta["Level"],
+                        meta["Bots"], tuple(meta["Invites"]))
+            room.bucket = _bucket(self._room_rate)
+            for key in meta["Members"]:
+                session = self._sessions.get(key)
+                if session is not None and session.room is None:
+                    room.members[session.username] = session
+                    session.room = room
+            room.resume(meta["Match"], self._games.add(game),
+                        meta["Version"], meta["Bounds"])
+            self._rooms[room.rid] = room
+            if self._replays is not None and room.match in self._replays:
+                self._live.add(room.match)
+            last = max(last, room.rid)
+        self._room_ids = count(last + 1)
+
+    # =============================================================
+    #                           Networking
+    # =============================================================
+
+    async def start(self, host: str = "127.0.0.1", port: int = 7500, **kwargs) -> asyncio.AbstractServer:
+        """Start listening. Extra keyword arguments go to loop.create_server."""
+        loop = asyncio.get_running_loop()
+        server = await loop.create_server(lambda: _Connection(self), host, port, **kwargs)
+        self._servers.append(server)
+        return server
+
+    async def start_unix(self, path: str, **kwargs) -> asyncio.AbstractServer:
+        """Start listening on a Unix socket. Extra keyword arguments go to loop.create_unix_server."""
+        loop = asyncio.get_running_loop()
+        server = await loop.create_unix_server(lambda: _Connection(self), path, **kwargs)
+        self._servers.append(server)
+        return server
+
+    def start_local(self, name: str | None = None) -> str:
+        """Accept in-process clients on local://name (the server name by default). Returns the URL."""
+        name = name or self._name
+        serve_local(name, self)
+        self._local.append(name)
+        return f"local://{name}"
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 7500, **kwargs):
+        server = await self.start(host, port, **kwargs)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for server in self._servers:
+            server.close()
+        self._servers.clear()
+        for task in tuple(self._tasks):
+            task.cancel()
+        self._queue.close()
+        for name in self._local:
+            stop_local(name)
+        self._local.clear()
+        if self._session_path is not None:
+            self._sessions.save(self._session_path)
+        if self._keeps_standings:
+            self._standings_now()
+            if self._unsaved:
+                self._leaderboard.checkpoint()
+                self._unsaved = 0
+
+    @property
+    def Rooms(self):
+        return len(self._rooms)
+
+    @property
+    def Sessions(self):
+        return len(self._sessions)
+
+    @property
+    def Games(self):
+        return len(self._games)
+
+
+class _Connection(asyncio.BufferedProtocol):
+    """One client connection. Frames are decoded straight from the receive buffer
+    and every reply of one read is sent with a single write."""
+
+    def __init__(self, server: RoomServer):
+        self._server = server
+        self._decoder = FrameDecoder()
+        self._transport: asyncio.Transport | None = None
+        self._bucket = _bucket(server._request_rate)
+        self._send_queue = server._send_queue
+        self._drained: asyncio.Future | None = None
+        self.paused = False
+        self.channels: set[Channel] = set()
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def connection_lost(self, exc):
+        self._transport = None
+        for channel in tuple(self.channels):
+            channel.discard(self)
+        self._drain()
+
+    @property
+    def closed(self):
+        return self._transport is None
+
+    async def drained(self):
+        """Wait until the client has read enough of its replies"""
+        if self.paused and self._transport is not None:
+            if self._drained is None:
+                self._drained = asyncio.get_running_loop().create_future()
+            await self._drained
+
+    def _drain(self):
+        drained, self._drained = self._drained, None
+        if drained is not None and not drained.done():
+            drained.set_result(None)
+
+    def write(self, data: bytes):
+        if self._transport is not None:
+            self._transport.write(data)
+
+    def get_buffer(self, sizehint: int):
+        return self._decoder.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int):
+        self._decoder.advance(nbytes)
+        replies = []
+        queued = self._transport.get_write_buffer_size()
+        try:
+            for frame in self._decoder.frames():
+                if queued > self._send_queue:
+                    status, summary, body = StatusENUM.OVERFLOW.value, "Read your replies first.", ''
+                elif self._bucket is not None and not self._bucket.take():
+                    status, summary, body = StatusENUM.OVERFLOW.value, "Too many requests.", ''
+                else:
+                    try:
+                        text = frame.text()
+                        if self._server._password(text[0]) is not None:
+                            # Its reply is written once hashed (clients match replies by ID)
+                            self._server._background(self._reply_hashed(frame.code, frame.rid, *text))
+                            continue
+                        status, summary, body = self._server.handle(
+                            frame.code, *text, self)
+                    except UnicodeDecodeError:
+                        status, summary, body = StatusENUM.REQ_SYNTAX_ERROR.value, "Request must be UTF-8.", ''
+                replies.append(encode_frame(
+                    status.code, summary, body, frame.rid))
+                queued += len(replies[-1])
+        except FrameError as exc:
+            replies.append(encode_frame(
+                StatusENUM.REQ_SYNTAX_ERROR.value.code, str(exc)))
+            self._transport.write(b''.join(replies))
+            self._transport.close()
+            return
+        if replies:
+            self._transport.write(b''.join(replies))
+
+    async def _reply_hashed(self, code: int, rid: int, summary: str, body: str):
+        status, summary, body = await self._server.handle_async(code, summary, body, self)
+        self.write(encode_frame(status.code, summary, body, rid))
+
+    def pause_writing(self):
+        # Stop reading requests until the client reads its replies.
+        self.paused = True
+        self._transport.pause_reading()
+
+    def resume_writing(self):
+        self.paused = False
+        self._transport.resume_reading()
+        self._drain()
+        for channel in tuple(self.channels):
+            channel.flush(self)
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="python -m packs.network.server",
+                            description="Run a GTRNv2 room server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7500)
+    parser.add_argument("--name", default="GTRNv2")
+    parser.add_argument("--session-ttl", type=float, default=3600,
+                        help="Seconds a session lives without use")
+    parser.add_argument("--session-lifetime", type=float, default=86400,
+                        help="Seconds a session key is valid after login, used or not")
+    parser.add_argument("--keep-sessions", action="store_true",
+                        help="Snapshot sessions into GameConfig.SessionPath across restarts")
+    parser.add_argument("--request-rate", type=float, default=1000,
+                        help="Requests per second allowed per connection (0: unlimited)")
+    parser.add_argument("--room-rate", type=float, default=500,
+                        help="Requests per second allowed per room (0: unlimited)")
+    parser.add_argument("--turn-timeout", type=float, default=30,
+                        help="Seconds a turn stays open after its first guess (0: until everyone guessed)")
+    parser.add_argument("--missing", choices=("skip", "repeat", "forfeit"), default="skip",
+                        help="What happens to players who miss a turn")
+    parser.add_argument("--match-size", type=int, default=2,
+                        help="Players per room formed by matchmaking")
+    parser.add_argument("--no-replays", action="store_true",
+                        help="Do not record matches into GameConfig.ReplayPath")
+    parser.add_argument("--checkpoints", action="store_true",
+                        help="Snapshot running matches into GameConfig.CheckpointPath and resume them on restart")
+    parser.add_argument("--unix", metavar="PATH",
+                        help="Also listen on a Unix socket for clients on this host")
+    args = parser.parse_args(argv)
+    server = RoomServer(args.name, session_ttl=args.session_ttl, session_lifetime=args.session_lifetime,
+                        session_path=GameConfig.SessionPath if args.keep_sessions else None,
+                        request_rate=args.request_rate or None, room_rate=args.room_rate or None,
+                        turn_timeout=args.turn_timeout or None, missing=args.missing,
+                        replay_path=None if args.no_replays else GameConfig.ReplayPath,
+                        checkpoint_path=GameConfig.CheckpointPath if args.checkpoints else None,
+                        match_size=args.match_size)
+    print(f"[GTRNv2] Serving {args.name} on {args.host}:{args.port}" +
+          (f" and {args.unix}" if args.unix else ""))
+
+    async def serve():
+        servers = [await server.start(args.host, args.port)]
+        if args.unix:
+            servers.append(await server.start_unix(args.unix))
+        await asyncio.gather(*(item.serve_forever() for item in servers))
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
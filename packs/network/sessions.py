@@ -0,0 +1,151 @@
+"""Session store
+
+Validating a session key is a dict lookup. Entries expire after `ttl` seconds without use
+and the least recently used entry is evicted when the store is full. Since every access
+moves an entry to the end, the OrderedDict is also ordered by expiry, so purging expired
+entries only ever looks at its front.
+
+Revoked keys (logged out, deleted or expired sessions) are remembered until the time they
+would stop being valid anyway, so a signed key cannot be adopted again after revoke()."""
+
+import json
+import os
+from collections import OrderedDict
+from time import monotonic, time
+from typing import Callable, Iterator
+
+
+class Session:
+    """Logged-in user. Identified by its (url-safe base64) session key."""
+
+    def __init__(self, username: str, uid: str, key: str):
+        self.username = username
+        self.uid = uid
+        self.key = key
+        self.room = None
+
+    def __repr__(self):
+        return f"Session({self.username})"
+
+
+class SessionStore:
+    """In-memory sessions with sliding TTL expiry and LRU eviction.
+
+    on_expire is called with every session that expires or is evicted (not with discarded ones)."""
+
+    def __init__(self, ttl: float = 3600, capacity: int = 100_000,
+                 on_expire: Callable[[Session], None] | None = None):
+        self._ttl = ttl
+        self._capacity = capacity
+        self._on_expire = on_expire
+        self._items: OrderedDict[str, tuple[Session, float]] = OrderedDict()
+        # Revoked key -> wall-clock time after which the key is refused anyway
+        self._revoked: dict[str, float] = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key: str):
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[Session]:
+        return (session for session, _ in tuple(self._items.values()))
+
+    def get(self, key: str) -> Session | None:
+        """Session of key, refreshing its expiry. None when unknown or expired."""
+        item = self._items.get(key)
+        if item is None:
+            return None
+        now = monotonic()
+        if item[1] < now:
+            self._expire(key)
+            return None
+        self._items[key] = (item[0], now + self._ttl)
+        self._items.move_to_end(key)
+        return item[0]
+
+    def add(self, session: Session, ttl: float | None = None):
+        self.purge()
+        self._items[session.key] = (
+            session, monotonic() + (self._ttl if ttl is None else ttl))
+        self._items.move_to_end(session.key)
+        while len(self._items) > self._capacity:
+            self._expire(next(iter(self._items)))
+
+    def discard(self, key: str) -> Session | None:
+        item = self._items.pop(key, None)
+        return item[0] if item else None
+
+    def revoke(self, key: str, until: float):
+        """Discard key and refuse it (see revoked()) until the wall-clock time until"""
+        self.discard(key)
+        if until > time():
+            self._revoked[key] = until
+
+    def revoked(self, key: str) -> bool:
+        until = self._revoked.get(key)
+        if until is None:
+            return False
+        if until < time():
+            del self._revoked[key]
+            return False
+        return True
+
+    def purge(self) -> int:
+        """Drop expired sessions. Returns how many were dropped."""
+        revoked = self._revoked
+        wall = time()
+        # Roughly ordered by expiry too (keys live equally long): stop at the first live one
+        while revoked:
+            key = next(iter(revoked))
+            if revoked[key] >= wall:
+                break
+            del revoked[key]
+        now = monotonic()
+        items = self._items
+        dropped = 0
+        while items:
+            key = next(iter(items))
+            if items[key][1] >= now:
+                break
+            self._expire(key)
+            dropped += 1
+        return dropped
+
+    def _expire(self, key: str):
+        session, _ = self._items.pop(key)
+        if self._on_expire is not None:
+            self._on_expire(session)
+
+    def save(self, path: str):
+        """Snapshot live sessions (without their rooms) and revoked keys into a JSON file"""
+        self.purge()
+        offset = time() - monotonic()
+        data = {"Sessions": [[session.key, session.username, session.uid, expires + offset]
+                             for session, expires in self._items.values()],
+                "Revoked": list(self._revoked.items())}
+        os.makedirs(os.path.dirname(path) or '.', 0o700, True)
+        with open(f"{path}.tmp", 'w') as file:
+            json.dump(data, file)
+        os.replace(f"{path}.tmp", path)
+
+    def load(self, path: str) -> int:
+        """Restore a snapshot made by save(). Returns how many sessions are still alive."""
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return 0
+        now = time()
+        if isinstance(data, list):
+            # Snapshot of a version without revocations
+            data = {"Sessions": data, "Revoked": []}
+        for key, until in data["Revoked"]:
+            if until > now:
+                self._revoked[key] = until
+        loaded = 0
+        for key, username, uid, expires in sorted(data["Sessions"], key=lambda item: item[3]):
+            if expires > now:
+                self.add(Session(username, uid, key), expires - now)
+                loaded += 1
+        return loaded
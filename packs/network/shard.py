@@ -0,0 +1,172 @@
+"""Multi-process room server
+
+Runs N RoomServer workers that share one public port through SO_REUSEPORT (or, where the
+platform lacks it, one listening socket created by the parent and handed to every worker).
+Rooms and accounts are assigned to workers by consistent hashing; a request that reaches the
+wrong worker is answered with MOVED and the address of the owning worker, which also listens
+on its own port (public port + 1 + worker index). Session keys are signed with a secret shared
+by all workers, so any worker accepts them.
+
+Matches are recorded into one replay directory (match IDs are unique in the cluster and name
+the worker that played them). Each worker keeps its own checkpoints (a worker-N directory in
+the checkpoint path) and sessions (sessions.json: sessions-worker-N.json, with the cluster
+secret in sessions.secret), so a restarted cluster with the same number of workers resumes
+every worker's matches.
+
+    python -m packs.network.shard --workers 4 --port 7500"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import secrets
+import socket
+from argparse import ArgumentParser
+from bisect import bisect
+from typing import NamedTuple
+
+from ..config import GameConfig
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hash ring over worker indexes. Each worker has `replicas` points on the ring."""
+
+    def __init__(self, workers: int, replicas: int = 64):
+        points = sorted((_hash(f"worker-{worker}-{replica}"), worker)
+                        for worker in range(workers) for replica in range(replicas))
+        self._points = [point for point, _ in points]
+        self._workers = [worker for _, worker in points]
+        self._size = workers
+
+    def __len__(self):
+        return self._size
+
+    def owner(self, key: str | int) -> int:
+        """Worker index owning key"""
+        index = bisect(self._points, _hash(str(key)))
+        return self._workers[index % len(self._workers)]
+
+
+class Shard(NamedTuple):
+    """Place of one worker in the cluster"""
+    index: int
+    ring: HashRing
+    addresses: tuple[str, ...]  # socket:// URL of every worker's own port
+
+    def owns(self, key: str | int) -> bool:
+        return self.ring.owner(key) == self.index
+
+    def address(self, key: str | int) -> str:
+        return self.addresses[self.ring.owner(key)]
+
+
+def worker_paths(index: int, replay_path: str | None = None, checkpoint_path: str | None = None,
+                 session_path: str | None = None) -> dict:
+    """RoomServer path arguments of worker index"""
+    paths = {"replay_path": replay_path, "checkpoint_path": None, "session_path": None}
+    if checkpoint_path is not None:
+        paths["checkpoint_path"] = os.path.join(checkpoint_path, f"worker-{index}")
+    if session_path is not None:
+        root, ext = os.path.splitext(session_path)
+        paths["session_path"] = f"{root}-worker-{index}{ext}"
+    return paths
+
+
+def cluster_secret(session_path: str | None = None) -> bytes:
+    """Secret shared by the workers. With session_path it is kept next to the sessions (mode
+    0600), so the session keys of a restarted cluster still verify on every worker."""
+    if session_path is None:
+        return secrets.token_bytes(32)
+    path = f"{os.path.splitext(session_path)[0]}.secret"
+    try:
+        with open(path, 'rb') as file:
+            return file.read()
+    except FileNotFoundError:
+        pass
+    secret = secrets.token_bytes(32)
+    os.makedirs(os.path.dirname(path) or '.', 0o700, True)
+    with open(path, 'wb', opener=lambda name, flags: os.open(name, flags, 0o600)) as file:
+        file.write(secret)
+    return secret
+
+
+async def _worker(index: int, workers: int, host: str, port: int, name: str, secret: bytes,
+                  listener: socket.socket | None, paths: dict):
+    from .server import RoomServer
+    addresses = tuple(
+        f"socket://{host}:{port + 1 + worker}" for worker in range(workers))
+    server = RoomServer(name, secret=secret,
+                        shard=Shard(index, HashRing(workers), addresses), **paths)
+    try:
+        if listener is None:
+            public = await server.start(host, port, reuse_port=True)
+        else:
+            public = await server.start(None, None, sock=listener)
+        private = await server.start(host, port + 1 + index)
+        async with public, private:
+            await asyncio.gather(public.serve_forever(), private.serve_forever())
+    finally:
+        server.close()
+
+
+def run_worker(index: int, workers: int, host: str, port: int, name: str, secret: bytes,
+               listener: socket.socket | None = None, paths: dict | None = None):
+    """Process entry point of one worker"""
+    try:
+        asyncio.run(_worker(index, workers, host,
+                    port, name, secret, listener, paths or {}))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(workers: int = os.cpu_count() or 1, host: str = "127.0.0.1", port: int = 7500, name: str = "GTRNv2", *,
+          replay_path: str | None = None, checkpoint_path: str | None = None, session_path: str | None = None):
+    """Start the workers and wait for them. The paths are split per worker by worker_paths()."""
+    secret = cluster_secret(session_path)
+    listener = None
+    if not hasattr(socket, "SO_REUSEPORT"):
+        listener = socket.create_server((host, port))
+    processes = [multiprocessing.Process(target=run_worker, name=f"GTRNv2-worker-{index}",
+                                         args=(index, workers, host, port, name, secret, listener,
+                                               worker_paths(index, replay_path, checkpoint_path, session_path)),
+                                         daemon=True)
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="python -m packs.network.shard",
+                            description="Run a GTRNv2 room server on several processes.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7500)
+    parser.add_argument("--name", default="GTRNv2")
+    parser.add_argument("--keep-sessions", action="store_true",
+                        help="Snapshot sessions into GameConfig.SessionPath (one file per worker) across restarts")
+    parser.add_argument("--no-replays", action="store_true",
+                        help="Do not record matches into GameConfig.ReplayPath")
+    parser.add_argument("--checkpoints", action="store_true",
+                        help="Snapshot running matches into GameConfig.CheckpointPath and resume them on restart")
+    args = parser.parse_args(argv)
+    print(f"[GTRNv2] Serving {args.name} on {args.host}:{args.port} with {args.workers} worker(s) "
+          f"(worker ports {args.port + 1}-{args.port + args.workers})")
+    serve(args.workers, args.host, args.port, args.name,
+          replay_path=None if args.no_replays else GameConfig.ReplayPath,
+          checkpoint_path=GameConfig.CheckpointPath if args.checkpoints else None,
+          session_path=GameConfig.SessionPath if args.keep_sessions else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Rate limiting (OVERFLOW)"""
+
+from time import monotonic
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average and bursts of up to `burst` requests.
+
+    Tokens are refilled lazily from the time elapsed since the last take(), so an idle
+    bucket costs nothing and needs no timer."""
+
+    __slots__ = ('rate', 'burst', '_tokens', '_stamp')
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = rate if burst is None else burst
+        self._tokens = self.burst
+        self._stamp = monotonic()
+
+    def take(self, tokens: float = 1) -> bool:
+        """Spend tokens. False (and nothing spent) when the bucket is short of them."""
+        now = monotonic()
+        self._tokens = min(self.burst, self._tokens +
+                           (now - self._stamp) * self.rate)
+        self._stamp = now
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
@@ -1,15 +1,81 @@
 """Players"""
 
-from typing import Any, Protocol, Sequence
+from array import array
+from collections.abc import Sequence as SequenceABC
+from random import Random
+from typing import Any, Iterable, Protocol, Sequence
 from uuid import UUID
 from ..utility import default_uid
 
 
+class Guesses:
+    """Append-only record of guesses, 8 bytes each in an array('q'). The first value that does
+    not fit (beyond 63 bits, or a missing guess) moves it into a plain list."""
+    __slots__ = ('_items',)
+
+    def __init__(self, values: Iterable[int | None] = ()):
+        self._items: array | list = array('q')
+        self.extend(values)
+
+    def append(self, value: int | None):
+        try:
+            self._items.append(value)
+        except (OverflowError, TypeError):
+            self._items = list(self._items)
+            self._items.append(value)
+
+    def extend(self, values: Iterable[int | None]):
+        for value in values:
+            self.append(value)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def last(self) -> int | None:
+        """Latest guess (None before the first one)"""
+        return self._items[-1] if self._items else None
+
+    def view(self) -> 'GuessesView':
+        return GuessesView(self)
+
+    def __repr__(self):
+        return f"Guesses({list(self._items)})"
+
+
+class GuessesView(SequenceABC):
+    """Read-only, live view of Guesses. Nothing is copied: indexing, len() and last() are O(1)."""
+    __slots__ = ('_guesses',)
+
+    def __init__(self, guesses: Guesses):
+        self._guesses = guesses
+
+    def __len__(self):
+        return len(self._guesses)
+
+    def __getitem__(self, index):
+        return self._guesses[index]
+
+    def __iter__(self):
+        return iter(self._guesses)
+
+    def last(self) -> int | None:
+        return self._guesses.last()
+
+    def __repr__(self):
+        return f"GuessesView({list(self._guesses)})"
+
+
 class ProtoPlayer(Protocol):
     """Protocol Player"""
     _name: str
     _state: Any
-    _history: list[int]
+    _history: Guesses
 
     def get_id(self) -> str | UUID | None:
         pass
@@ -26,6 +92,9 @@ class ProtoPlayer(Protocol):
     def reset(self):
         pass
 
+    def use_random(self, rng: Random):
+        pass
+
     @property
     def name(self) -> str:
         return self._name
@@ -41,15 +110,23 @@ class ProtoPlayer(Protocol):
     def history(self):
         return tuple(self._history)
 
+    @property
+    def guesses(self) -> GuessesView:
+        return self._history.view()
+
+    def last(self) -> int | None:
+        return self._history.last()
+
 
 class BasePlayer:
     """Base class for Player-related class."""
+    __slots__ = ('_uid', '_name', '_level', '_history', '_state')
 
     def __init__(self, name: str, level: int):
-        self._uid: UUID = default_uid
+        self._uid: UUID | str = default_uid
         self._name = name
         self._level = level
-        self._history = []
+        self._history = Guesses()
         self._state = None
 
     def get_state(self):
@@ -71,11 +148,24 @@ class BasePlayer:
         return self._name if not hasattr(self, '_uid') else self._uid
 
     def history(self):
+        """Copy of every guess; prefer guesses or last() when a view will do"""
         return tuple(self._history)
 
+    @property
+    def guesses(self) -> GuessesView:
+        """Read-only view of every guess"""
+        return self._history.view()
+
+    def last(self) -> int | None:
+        """Latest guess (None before the first one)"""
+        return self._history.last()
+
     def reset(self):
         pass
 
+    def use_random(self, rng: Random):
+        """Draw from the generator of the game being played (only bots draw at all)"""
+
     @property
     def name(self):
         return self._name
@@ -1,21 +1,33 @@
-from random import choice, randint
-
+from random import Random
 
 from ..utility.identifiers import Identifier, big, small
-from . import BasePlayer
+from . import BasePlayer, Guesses, GuessesView
 from ..game import BaseGame
 
 
 class Bot(BasePlayer):
-    def __init__(self, name: str, level: int):
+    """Guesses within the bounds the verdicts left open.
+
+    With probability explore a guess is uniformly random (explore=1, the default, always
+    is); otherwise it lands at bias of the way through the open bounds (0.5: bisection)."""
+    __slots__ = ('_random', '_explore', '_bias', '_max', '_min', '_level_max', '_level_min',
+                 '_last', '_floor', '_ceiling', '_pendings', '_max_pending')
+
+    def __init__(self, name: str, level: int, rng: Random | None = None, *,
+                 explore: float = 1.0, bias: float = 0.5):
         super().__init__(name, level)
+        self._random = rng or Random()
+        self._explore = explore
+        self._bias = bias
         self._max: int = BaseGame.level.get(level, [1024, 0])[0]
         self._min: int = BaseGame.level.get(level, [0, -1024])[1]
         # self._xmin = self._xmax = 0
         self._level_max = self._max
         self._level_min = self._min
-        self._last: list[int] = []
-        self._historie: list[Identifier] = []
+        self._last = Guesses()
+        # Tightest bounds given by the verdicts on our own guesses (all that is kept of them)
+        self._floor: int | None = None
+        self._ceiling: int | None = None
         self._pendings: list[Identifier] = []
         self._max_pending = 1
 
@@ -31,12 +43,19 @@ class Bot(BasePlayer):
         if self._min > self._max:
             self._max, self._min = self._min, self._max
         # print(f"min = {self._min} | max = {self._max}")
+        # Default bots never draw here, so their games stay what they were for a seed.
+        if self._explore < 1 and self._max - self._min >= 2 and self._random.random() >= self._explore:
+            returner = self._min + 1 + \
+                round(self._bias * (self._max - self._min - 2))
+            if returner not in self._last:
+                self._last.append(returner)
+                return returner
         try:
-            returner = choice(
+            returner = self._random.choice(
                 tuple(set(range(self._min, self._max)).difference(self._last)))
         except IndexError:
             self.reset()
-            returner = randint(self._level_min, self._level_max)
+            returner = self._random.randint(self._level_min, self._level_max)
         self._last.append(returner)
         # print('finished')
         return returner
@@ -48,17 +67,21 @@ class Bot(BasePlayer):
             raise ValueError("Players required")
         for value in values:
             if value.player is self:
-                self._historie.append(value)
+                if value.was == small:
+                    self._floor = value.value if self._floor is None else max(
+                        self._floor, value.value)
+                if value.was == big:
+                    self._ceiling = value.value if self._ceiling is None else min(
+                        self._ceiling, value.value)
             if value.was == small:
                 self._min = max(self._min, value.value)
             if value.was == big:
                 self._max = min(self._max, value.value)
 
-        for history in self._historie:
-            if history.was == small:
-                self._min = max(self._min, history.value)
-            if history.was == big:
-                self._max = min(self._max, history.value)
+        if self._floor is not None:
+            self._min = max(self._min, self._floor)
+        if self._ceiling is not None:
+            self._max = min(self._max, self._ceiling)
 
         # print(f"max = {self._max} | min = {self._min}")
 
@@ -77,9 +100,19 @@ class Bot(BasePlayer):
         self.critical_put(*self._pendings)
         self._pendings.clear()
 
+    def use_random(self, rng: Random):
+        self._random = rng
+
     def reset(self):
         self._max: int = self._level_max
         self._min: int = self._level_min
 
     def history(self):
         return tuple(self._last)
+
+    @property
+    def guesses(self) -> GuessesView:
+        return self._last.view()
+
+    def last(self) -> int | None:
+        return self._last.last()
@@ -2,6 +2,8 @@ from . import BasePlayer
 
 
 class Player(BasePlayer):
+    __slots__ = ()
+
     def __init__(self, name: str):
         super().__init__(name, 0)
 
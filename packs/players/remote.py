@@ -0,0 +1,30 @@
+from uuid import UUID
+
+from . import BasePlayer
+
+
+class RemotePlayer(BasePlayer):
+    """Player whose guesses arrive over the network.
+
+    The server calls submit() when a guess arrives and the game picks it up with get()."""
+    __slots__ = ('_pending',)
+
+    def __init__(self, name: str, uid: UUID | str):
+        super().__init__(name, 0)
+        self._uid = uid
+        self._pending: int | None = None
+
+    def submit(self, value: int):
+        self._pending = value
+
+    @property
+    def ready(self):
+        return self._pending is not None
+
+    def get(self):
+        value, self._pending = self._pending, None
+        self._history.append(value)
+        return value
+
+    def reset(self):
+        self._pending = None
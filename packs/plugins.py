@@ -0,0 +1,201 @@
+"""Plugins
+
+Bot strategies and game variants installed as single-file modules in
+GameConfig.PluginPath (project:///plugins/). A plugin declares what it provides with
+literal module-level dicts, which are read without importing it:
+
+    STRATEGIES = {"cautious": {"explore": 0.1, "bias": 0.5},   # Bot keyword arguments
+                  "greedy": "GreedyBot"}                       # a Bot subclass in the module
+    VARIANTS = {"sudden-death": "SuddenDeath"}                 # a BaseGame subclass
+
+What was read is kept in an index (.index.json in the plugin directory) keyed by each
+file's mtime and size, with its SHA-256 to tell a touched file from an edited one. Only
+new or changed files are read again; a plugin module is imported the first time one of
+its classes is asked for, and nothing at all is done until the first lookup.
+
+    python -m packs.plugins            # list what is installed"""
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from typing import Any
+
+from .config import GameConfig
+
+INDEX = ".index.json"
+VERSION = 1
+KINDS = ("STRATEGIES", "VARIANTS")
+
+
+class PluginError(Exception):
+    """A plugin is missing, malformed or does not provide what it declares"""
+
+
+def declarations(source: bytes, filename: str = "<plugin>") -> dict[str, dict]:
+    """STRATEGIES and VARIANTS of a plugin's source, read without running it"""
+    found = {kind: {} for kind in KINDS}
+    for node in ast.parse(source, filename).body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 \
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id in KINDS:
+            value = ast.literal_eval(node.value)
+            if not isinstance(value, dict):
+                raise PluginError(f"{filename}: {node.targets[0].id} is not a dict")
+            found[node.targets[0].id] = value
+    # Everything declared goes into the JSON index: names are strings, arguments plain values
+    for kind in KINDS:
+        if not all(isinstance(name, str) for name in found[kind]):
+            raise PluginError(f"{filename}: {kind} names must be strings")
+    for name, value in found["STRATEGIES"].items():
+        if not isinstance(value, (dict, str)):
+            raise PluginError(f"{filename}: strategy {name!r} is neither Bot arguments nor a class name")
+        if isinstance(value, dict) and not all(
+                isinstance(key, str) and isinstance(argument, (int, float, str, type(None)))
+                for key, argument in value.items()):
+            raise PluginError(f"{filename}: strategy {name!r} has arguments other than named numbers or strings")
+    for name, value in found["VARIANTS"].items():
+        if not isinstance(value, str):
+            raise PluginError(f"{filename}: variant {name!r} is not a class name")
+    return found
+
+
+class PluginIndex:
+    """Strategies and variants of the plugins in path, discovered on first use"""
+
+    def __init__(self, path: str | None = None):
+        self._path = path if path is not None else GameConfig.PluginPath
+        self._entries: dict[str, dict] | None = None
+        self._modules: dict[str, Any] = {}
+
+    def refresh(self) -> dict[str, dict]:
+        """Bring the index up to date with the plugin directory and save it if it changed"""
+        index_path = os.path.join(self._path, INDEX)
+        try:
+            with open(index_path) as file:
+                saved = json.load(file)
+            old = saved["Plugins"] if saved.get("Version") == VERSION else {}
+        except (OSError, ValueError, KeyError):
+            old = {}
+        entries = {}
+        try:
+            scan = sorted((entry for entry in os.scandir(self._path)
+                           if entry.name.endswith(".py") and entry.is_file()),
+                          key=lambda entry: entry.name)
+        except FileNotFoundError:
+            scan = []
+        for entry in scan:
+            stat = entry.stat()
+            cached = old.get(entry.name)
+            if cached is not None and cached["Mtime"] == stat.st_mtime_ns and cached["Size"] == stat.st_size:
+                entries[entry.name] = cached
+                continue
+            with open(entry.path, 'rb') as file:
+                source = file.read()
+            digest = hashlib.sha256(source).hexdigest()
+            if cached is not None and cached["Hash"] == digest:
+                entries[entry.name] = {**cached, "Mtime": stat.st_mtime_ns, "Size": stat.st_size}
+                continue
+            record = {"Mtime": stat.st_mtime_ns, "Size": stat.st_size, "Hash": digest,
+                      "Strategies": {}, "Variants": {}, "Error": None}
+            try:
+                found = declarations(source, entry.path)
+                record["Strategies"], record["Variants"] = found["STRATEGIES"], found["VARIANTS"]
+            except (SyntaxError, ValueError, TypeError, MemoryError, RecursionError, PluginError) as exc:
+                # A malformed plugin is recorded as such; the others are still indexed
+                record["Error"] = f"{type(exc).__name__}: {exc}"
+            entries[entry.name] = record
+        if entries != old and os.path.isdir(self._path):
+            with open(f"{index_path}.tmp", 'w') as file:
+                json.dump({"Version": VERSION, "Plugins": entries}, file, indent=2)
+            os.replace(f"{index_path}.tmp", index_path)
+        self._entries = entries
+        return entries
+
+    @property
+    def Plugins(self) -> dict[str, dict]:
+        if self._entries is None:
+            self.refresh()
+        return self._entries  # type: ignore
+
+    def _find(self, field: str, name: str) -> tuple[str, Any]:
+        # Files are scanned in name order; the first one declaring a name provides it
+        for filename, record in self.Plugins.items():
+            if name in record[field]:
+                return filename, record[field][name]
+        raise PluginError(f"No plugin provides {field[:-1].lower()} {name!r}")
+
+    def strategies(self) -> list[str]:
+        return list(dict.fromkeys(name for record in self.Plugins.values()
+                                  for name in record["Strategies"]))
+
+    def variants(self) -> list[str]:
+        return list(dict.fromkeys(name for record in self.Plugins.values()
+                                  for name in record["Variants"]))
+
+    def _load(self, filename: str):
+        module = self._modules.get(filename)
+        if module is not None:
+            return module
+        modname = f"gtrnv2_plugin_{filename[:-3]}"
+        spec = importlib.util.spec_from_file_location(
+            modname, os.path.join(self._path, filename))
+        if spec is None or spec.loader is None:
+            raise PluginError(f"Cannot load plugin {filename}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[modname] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[modname]
+            raise
+        self._modules[filename] = module
+        return module
+
+    def _class(self, filename: str, classname: str, base: type) -> type:
+        cls = getattr(self._load(filename), classname, None)
+        if not (isinstance(cls, type) and issubclass(cls, base)):
+            raise PluginError(f"{filename}: {classname} is not a {base.__name__} subclass")
+        return cls
+
+    def strategy(self, name: str) -> tuple[type, dict]:
+        """(Bot class, keyword arguments) of a strategy. Argument-only strategies import nothing."""
+        from .players.bot import Bot
+        filename, value = self._find("Strategies", name)
+        if isinstance(value, dict):
+            return Bot, value
+        return self._class(filename, value, Bot), {}
+
+    def variant(self, name: str) -> type:
+        """Game class of a variant (its plugin is imported on first use)"""
+        from .game import BaseGame
+        filename, value = self._find("Variants", name)
+        return self._class(filename, value, BaseGame)
+
+
+# Default index over GameConfig.PluginPath; building it costs nothing until used
+plugins = PluginIndex()
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="python -m packs.plugins",
+                            description="List the bot strategies and game variants installed as plugins.")
+    parser.add_argument("--path", default=GameConfig.PluginPath,
+                        help="Plugin directory (default: GameConfig.PluginPath)")
+    args = parser.parse_args(argv)
+
+    index = PluginIndex(args.path)
+    for filename, record in index.refresh().items():
+        if record["Error"] is not None:
+            print(f"[GTRNv2] {filename}: {record['Error']}")
+            continue
+        print(f"[GTRNv2] {filename}: strategies={', '.join(record['Strategies']) or '-'} "
+              f"variants={', '.join(record['Variants']) or '-'}")
+    if not index.Plugins:
+        print(f"[GTRNv2] No plugins in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Profiling entry point
+
+Runs a headless ZeroPlayer workload under cProfile and tracemalloc and writes sorted
+CPU and allocation reports into GameConfig.LogPath (project:///logs/).
+
+    python -m packs.profile --level 5 --bots 8 --games 20
+    python -m packs.profile --level 12 --bots 2 --sort tottime
+
+Both passes use the same seeds (game i is seeded with seed + i), so the CPU and allocation
+reports describe the same games."""
+
+import os
+import tracemalloc
+from argparse import ArgumentParser
+from cProfile import Profile
+from io import StringIO
+from pstats import Stats
+from time import perf_counter, strftime
+
+from .config import GameConfig
+from .game import BaseGame
+from .game.zeroplayer import ZeroPlayer
+
+
+def workload(level: int, bots: int, games: int, seed: int | None = None):
+    """Play `games` headless games and return the turn count of each one."""
+    turns = []
+    for index in range(games):
+        game = ZeroPlayer(bots, level, delay=0, stream=None)
+        game.set_seed(None if seed is None else seed + index)
+        game.run()
+        turns.append(game._turn)
+        game.reset()
+    return turns
+
+
+def profile_cpu(level: int, bots: int, games: int, seed: int | None, sort: str, limit: int):
+    """Run the workload under cProfile. Returns (report, elapsed, turns)."""
+    profiler = Profile()
+    start = perf_counter()
+    profiler.enable()
+    turns = workload(level, bots, games, seed)
+    profiler.disable()
+    elapsed = perf_counter() - start
+    stream = StringIO()
+    Stats(profiler, stream=stream).strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue(), elapsed, turns
+
+
+def profile_memory(level: int, bots: int, games: int, seed: int | None, key: str, limit: int):
+    """Run the workload under tracemalloc. Returns (report, peak).
+
+    The peak is tracked per game, so transient blowups (Bot.get on high levels) show up
+    even though they are freed before the final snapshot."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for index in range(games):
+            tracemalloc.reset_peak()
+            workload(level, bots, 1, None if seed is None else seed + index)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+        snapshot = tracemalloc.take_snapshot()
+        current = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    peak = max(peaks, default=0)
+    lines = [f"Current: {current} B | Peak: {peak} B",
+             f"Peak per game: {', '.join(map(str, peaks))}", ""]
+    lines.extend(str(stat) for stat in snapshot.statistics(key)[:limit])
+    return '\n'.join(lines), peak
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="python -m packs.profile",
+                            description="Profile a headless GTRNv2 workload.")
+    parser.add_argument("--level", type=int, default=5,
+                        choices=tuple(BaseGame.level), metavar="LEVEL",
+                        help=f"Key of BaseGame.level ({min(BaseGame.level)}-{max(BaseGame.level)})")
+    parser.add_argument("--bots", type=int, default=2)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sort", default="cumulative",
+                        help="pstats sort key (cumulative, tottime, calls, ...)")
+    parser.add_argument("--group", default="lineno", choices=("lineno", "filename", "traceback"),
+                        help="tracemalloc statistics key")
+    parser.add_argument("--limit", type=int, default=40)
+    parser.add_argument("--output", default=GameConfig.LogPath,
+                        help="Report directory (default: GameConfig.LogPath)")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc pass")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, 0o700, True)
+    prefix = os.path.join(
+        args.output, f"profile-{strftime('%Y%m%d-%H%M%S')}-L{args.level}-B{args.bots}")
+    header = f"level={args.level} range={BaseGame.level[args.level]} bots={args.bots} games={args.games} seed={args.seed}\n\n"
+
+    report, elapsed, turns = profile_cpu(
+        args.level, args.bots, args.games, args.seed, args.sort, args.limit)
+    with open(f"{prefix}-cpu.txt", 'w') as file:
+        file.write(header)
+        file.write(f"Elapsed: {elapsed:.4f}s | Turns: {sum(turns)}\n")
+        file.write(report)
+    print(f"[GTRNv2] CPU report: {prefix}-cpu.txt ({elapsed:.4f}s, {sum(turns)} turn(s))")
+
+    if args.no_memory:
+        return
+    report, peak = profile_memory(
+        args.level, args.bots, args.games, args.seed, args.group, args.limit)
+    with open(f"{prefix}-alloc.txt", 'w') as file:
+        file.write(header)
+        file.write(report)
+    print(f"[GTRNv2] Allocation report: {prefix}-alloc.txt (peak {peak} B)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Bot strategy tuner
+
+Searches Bot strategies (explore, bias) for a level by successive halving: every
+candidate plays a few seeded headless games, the better half (1/eta) goes on to play
+eta times as many, and so on until one is left. Games run on a process pool, all
+candidates of a round play the same seeds (so they are compared on the same games),
+and each round is written to disk as soon as it is scored.
+
+A candidate is scored by how often it wins from a rotating seat against `opponents`
+default bots (a win shared by k bots in the same turn counts 1/k), then by how few turns
+its games take.
+
+    python -m packs.tuner --level 4 --candidates 32 --games 32 --opponents 1
+
+Results go to GameConfig.LogPath (project:///logs/) as JSON."""
+
+import json
+import os
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from time import perf_counter, strftime
+
+from .config import GameConfig
+from .game import BaseGame
+from .game.zeroplayer import ZeroPlayer
+
+# Games per task sent to the pool
+CHUNK = 64
+# The current default Bot, always among the candidates as a baseline
+BASELINE = {"explore": 1.0, "bias": 0.5}
+
+
+def evaluate(strategy: dict, level: int, opponents: int, games: int, seed: int) -> tuple[float, int]:
+    """Play games with strategy in seat (game index mod seats). Returns (wins, turns)."""
+    seats = opponents + 1
+    wins, turns = 0.0, 0
+    for index in range(games):
+        strategies = [{}] * seats
+        strategies[(seed + index) % seats] = strategy
+        game = ZeroPlayer(seats, level, delay=0, stream=None,
+                          strategies=strategies)
+        game.set_seed(seed + index)
+        game.run()
+        turns += game._turn
+        if game._players[(seed + index) % seats] in game._winner:
+            wins += 1 / len(game._winner)
+    return wins, turns
+
+
+def _evaluate(task: tuple) -> tuple[float, int]:
+    return evaluate(*task)
+
+
+def candidates(count: int, seed: int) -> list[dict]:
+    """The baseline and count - 1 random strategies"""
+    rng = Random(seed)
+    return [dict(BASELINE)] + [{"explore": round(rng.random(), 3), "bias": round(rng.random(), 3)}
+                               for _ in range(count - 1)]
+
+
+def tune(level: int, strategies: list[dict], games: int = 32, *, eta: int = 2, opponents: int = 1,
+         seed: int = 0, workers: int | None = None, path: str | None = None) -> dict:
+    """Successive halving over strategies. Returns the report (also written to path after
+    every round)."""
+    report = {"Level": level, "Opponents": opponents, "Eta": eta, "Seed": seed,
+              "Rounds": [], "Best": None}
+    alive = list(strategies)
+    played = 0
+    with ProcessPoolExecutor(workers) as executor:
+        while True:
+            start = perf_counter()
+            round_seed = seed + played
+            tasks = [(strategy, level, opponents, min(CHUNK, games - offset), round_seed + offset)
+                     for strategy in alive for offset in range(0, games, CHUNK)]
+            totals = [[0, 0] for _ in alive]
+            per_candidate = len(range(0, games, CHUNK))
+            for index, (wins, turns) in enumerate(executor.map(_evaluate, tasks)):
+                totals[index // per_candidate][0] += wins
+                totals[index // per_candidate][1] += turns
+            results = sorted(({**strategy, "WinRate": wins / games, "MeanTurns": turns / games}
+                              for strategy, (wins, turns) in zip(alive, totals)),
+                             key=lambda result: (-result["WinRate"], result["MeanTurns"]))
+            report["Rounds"].append({"Games": games, "Seed": round_seed,
+                                     "Elapsed": round(perf_counter() - start, 3), "Results": results})
+            report["Best"] = results[0]
+            if path is not None:
+                with open(f"{path}.tmp", 'w') as file:
+                    json.dump(report, file, indent=2)
+                os.replace(f"{path}.tmp", path)
+            if len(results) == 1:
+                return report
+            played += games
+            alive = [{"explore": result["explore"], "bias": result["bias"]}
+                     for result in results[:max(len(results) // eta, 1)]]
+            games *= eta
+
+
+def main(argv: list[str] | None = None):
+    parser = ArgumentParser(prog="python -m packs.tuner",
+                            description="Tune Bot strategies by successive halving.")
+    parser.add_argument("--level", type=int, default=3,
+                        choices=tuple(BaseGame.level), metavar="LEVEL",
+                        help=f"Key of BaseGame.level ({min(BaseGame.level)}-{max(BaseGame.level)})")
+    parser.add_argument("--candidates", type=int, default=16)
+    parser.add_argument("--games", type=int, default=32,
+                        help="Games per candidate in the first round")
+    parser.add_argument("--eta", type=int, default=2,
+                        help="Keep 1/eta of the candidates each round")
+    parser.add_argument("--opponents", type=int, default=1,
+                        help="Default bots every candidate plays against")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes (default: one per core)")
+    parser.add_argument("--output", default=GameConfig.LogPath,
+                        help="Report directory (default: GameConfig.LogPath)")
+    args = parser.parse_args(argv)
+    if args.eta < 2:
+        parser.error("--eta must be at least 2")
+
+    os.makedirs(args.output, 0o700, True)
+    path = os.path.join(
+        args.output, f"tune-{strftime('%Y%m%d-%H%M%S')}-L{args.level}.json")
+    report = tune(args.level, candidates(args.candidates, args.seed), args.games, eta=args.eta,
+                  opponents=args.opponents, seed=args.seed, workers=args.workers, path=path)
+    for number, round_ in enumerate(report["Rounds"], 1):
+        best = round_["Results"][0]
+        print(f"[GTRNv2] Round {number}: {len(round_['Results'])} candidate(s) x {round_['Games']} game(s) "
+              f"in {round_['Elapsed']}s, best explore={best['explore']} bias={best['bias']} "
+              f"win rate={best['WinRate']:.3f} turns={best['MeanTurns']:.2f}")
+    print(f"[GTRNv2] Report: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -414,9 +414,9 @@ def install():
     # install
     # Folder structure:
     #           /
-    # game.db  plugin/ downloads/ crash/ logs/
+    # game.db  plugins/ downloads/ crash/ logs/
     path = getpath()
-    os.makedirs(f'{path}/plugin', 0o700, True)
+    os.makedirs(f'{path}/plugins', 0o700, True)
     os.makedirs(f'{path}/downloads', 0o700, True)
     os.makedirs(f'{path}/logs', 0o700, True)
     os.makedirs(f'{path}/crash', 0o700, True)
@@ -0,0 +1,40 @@
+"""Shared helpers: RoomServer requests are written by hand, so fields are encoded here"""
+
+from base64 import b64encode
+
+import pytest
+
+from packs.databases.game import GameDB
+from packs.network.libnetutil import StatusENUM
+from packs.network.server import RoomServer
+
+SECRET = b"s" * 32
+
+
+def encode(value: str) -> str:
+    return b64encode(value.encode('utf-8'), b'-_').decode()
+
+
+@pytest.fixture(autouse=True)
+def database():
+    """Every test starts from an empty GameDB (in memory, shared by the servers of a test)"""
+    GameDB().reset()
+    yield GameDB()
+
+
+def sign_in(server: RoomServer, username: str) -> str:
+    """Session key of a new account"""
+    status, _, body = server.handle(
+        302, f"Push Data as AN[{encode(username)}] and AP[{encode('pw')}] then Connect", "")
+    assert status.code == StatusENUM.CONNECT_SUCCESS.value.code
+    return body[len("You["):-1]
+
+
+@pytest.fixture
+def alice():
+    """A server with alice logged in and owning Room[1]. Yields (server, alice's self[...] field)."""
+    server = RoomServer(secret=SECRET, turn_timeout=None, room_rate=None)
+    key = sign_in(server, "alice")
+    server.handle(302, f"Push room as Owner[{encode('alice')}:{key}]", '{"Level": 2}')
+    yield server, f"self[{encode('alice')}:{key}]"
+    server.close()
@@ -0,0 +1,35 @@
+"""Turns-to-win summaries (packs.analytics)"""
+
+import numpy as np
+import pytest
+
+from packs.analytics import QUANTILES, Results, simulate, summarize
+
+
+def test_quantiles_match_numpy():
+    rng = np.random.default_rng(3)
+    records = [(level, bots, int(rng.geometric(0.2 * level)), int(rng.integers(-1, bots)))
+               for level, bots in ((1, 2), (2, 1), (2, 4)) for _ in range(999)]
+    results = Results.from_records(records)
+    summary = summarize(results)
+    assert [(row["Level"], row["Bots"], row["Games"]) for row in summary] == [(1, 2, 999), (2, 1, 999), (2, 4, 999)]
+    for row in summary:
+        mask = (results.level == row["Level"]) & (results.bots == row["Bots"])
+        turns = results.turns[mask]
+        expected = np.quantile(turns, QUANTILES, method="inverted_cdf")
+        assert list(row["Quantiles"].values()) == expected.tolist()
+        assert row["Mean"] == pytest.approx(turns.mean()) and row["Std"] == pytest.approx(turns.std())
+        assert (row["Min"], row["Max"]) == (turns.min(), turns.max())
+        assert sum(row["Histogram"]["Counts"]) == row["Games"]
+        winners = results.winner[mask]
+        assert row["NoWinner"] == pytest.approx(np.mean(winners == -1))
+        assert row["WinShare"] == pytest.approx([np.mean(winners == seat) for seat in range(row["Bots"])])
+
+
+def test_simulated_results_round_trip(tmp_path):
+    results = simulate(2, 3, 20, seed=1)
+    assert results.Games == 20 and (results.turns > 0).all() and set(results.winner) <= {0, 1, 2}
+    results.save(str(tmp_path / "results.npz"))
+    loaded = Results.load(str(tmp_path / "results.npz"))
+    assert all((column == original).all() for column, original in zip(loaded, results))
+    assert summarize(Results.from_records(())) == []
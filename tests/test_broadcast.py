@@ -0,0 +1,63 @@
+"""Room broadcast channels (packs.network.broadcast)"""
+
+from packs.network.broadcast import Channel
+
+
+class Spectator:
+    def __init__(self):
+        self.paused = False
+        self.closed = False
+        self.channels = set()
+        self.received = []
+
+    def write(self, data: bytes):
+        self.received.append(data)
+
+    async def drained(self):
+        pass
+
+
+def test_every_subscriber_gets_the_same_frame():
+    channel = Channel(1)
+    spectators = [Spectator() for _ in range(3)]
+    for spectator in spectators:
+        channel.add(spectator)
+    channel.publish(b"turn 1")
+    assert all(spectator.received == [b"turn 1"] for spectator in spectators)
+    # One encoded frame, not a copy per subscriber
+    assert len({id(spectator.received[0]) for spectator in spectators}) == 1
+
+
+def test_lagging_subscriber_gets_only_the_latest_update():
+    channel = Channel(1)
+    fast, slow = Spectator(), Spectator()
+    channel.add(fast)
+    channel.add(slow)
+    slow.paused = True
+    for turn in range(1, 4):
+        channel.publish(f"turn {turn}".encode())
+    assert slow.received == []
+    slow.paused = False
+    channel.flush(slow)
+    channel.flush(slow)
+    assert slow.received == [b"turn 3"]
+    assert fast.received == [b"turn 1", b"turn 2", b"turn 3"]
+
+
+def test_close_sends_a_final_frame_and_drops_everyone():
+    channel = Channel(1)
+    spectator = Spectator()
+    channel.add(spectator)
+    channel.close(b"done")
+    assert spectator.received == [b"done"] and spectator.channels == set() and len(channel) == 0
+
+
+def test_turns_are_pushed_to_spectators(alice):
+    server, me = alice
+    spectator = Spectator()
+    assert server.handle(304, f"Subscribe {me} to Room[1]", "", spectator)[0].code == 1
+    server.handle(302, f"Push Guess[0] to Room[1] as {me}", "")
+    assert len(spectator.received) == 1
+    server.handle(305, f"Unsubscribe {me} from Room[1]", "", spectator)
+    server.handle(302, f"Push Guess[0] to Room[1] as {me}", "")
+    assert len(spectator.received) == 1
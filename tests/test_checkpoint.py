@@ -0,0 +1,107 @@
+"""Binary game checkpoints (packs.game.checkpoint)"""
+
+import sys
+
+import pytest
+
+from packs.game import checkpoint
+from packs.game.room import RoomGame
+from packs.game.zeroplayer import ZeroPlayer
+from packs.network.server import RoomServer
+from packs.players.bot import Bot
+from packs.players.remote import RemotePlayer
+
+from .conftest import SECRET, encode, sign_in
+
+
+def started_room(seed: int = 7) -> RoomGame:
+    game = RoomGame(3)
+    game.register_player(Bot("Bot-0", 3, explore=0.5, bias=0.25))
+    game.register_player(RemotePlayer("alice", "uid-alice"))
+    game.set_seed(seed)
+    game.run()
+    return game
+
+
+def play(game: RoomGame, guesses) -> list:
+    verdicts = []
+    for guess in guesses:
+        game._players[-1].submit(guess)
+        verdicts.append([(identifier.player.name, identifier.value, identifier.was)
+                         for identifier in game.play_turn()])
+    return verdicts
+
+
+def test_round_trip_continues_identically():
+    game = started_room()
+    play(game, (1, 2, 3))
+    restored = checkpoint.load(checkpoint.dump(game))
+    assert restored is not game
+    assert (restored.Mystery, restored.Turn, restored.Seed) == (game.Mystery, game.Turn, game.Seed)
+    assert [player.history() for player in restored.Players] == [player.history() for player in game.Players]
+    assert play(restored, (4, 5, 6)) == play(game, (4, 5, 6))
+
+
+def test_finished_zeroplayer_round_trip():
+    game = ZeroPlayer(3, 4, delay=0, stream=None)
+    game.set_seed(1)
+    game.run()
+    restored = checkpoint.load(checkpoint.dump(game), stream=None, delay=0)
+    assert restored._turn == game._turn
+    assert [player.name for player in restored._winner] == [player.name for player in game._winner]
+    assert [player.history() for player in restored._players] == [player.history() for player in game._players]
+
+
+def test_big_levels_round_trip():
+    game = RoomGame(100)
+    game.register_player(RemotePlayer("alice", "uid-alice"))
+    game.run()
+    play(game, (2 ** 90, -2 ** 90))
+    restored = checkpoint.load(checkpoint.dump(game))
+    assert restored.Mystery == game.Mystery
+    assert restored.Players[0].history() == (2 ** 90, -2 ** 90)
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data[:10],
+    lambda data: b"XXXX" + data[4:],
+    lambda data: data[:-3],
+])
+def test_damaged_snapshot_is_refused(damage):
+    with pytest.raises(checkpoint.CheckpointError):
+        checkpoint.load(damage(checkpoint.dump(started_room())))
+
+
+def test_short_integer_stream_is_refused():
+    data = checkpoint.dump(started_room())
+    magic, version, width, count, size, words = checkpoint.HEADER.unpack_from(data)
+    short = checkpoint.HEADER.pack(magic, version, width, count - 1, size, words) \
+        + data[checkpoint.HEADER.size:-width]
+    with pytest.raises(checkpoint.CheckpointError):
+        checkpoint.load(short)
+
+
+@pytest.mark.parametrize("path", ["this:Game", "packs.utility:make_uid", "os:PathLike"])
+def test_classes_outside_the_game_are_refused(monkeypatch, path):
+    data = checkpoint.dump(started_room())
+    monkeypatch.setattr(checkpoint, "_path", lambda obj: path)
+    with pytest.raises(checkpoint.CheckpointError):
+        checkpoint.load(checkpoint.dump(started_room()))
+    assert "this" not in sys.modules
+    monkeypatch.undo()
+    assert checkpoint.load(data).Level == 3
+
+
+def test_server_resumes_a_running_match(tmp_path):
+    paths = {"session_path": str(tmp_path / "sessions.json"), "checkpoint_path": str(tmp_path / "checkpoints")}
+    server = RoomServer(secret=SECRET, turn_timeout=None, room_rate=None, **paths)
+    key = sign_in(server, "alice")
+    me = f"self[{encode('alice')}:{key}]"
+    server.handle(302, f"Push room as Owner[{encode('alice')}:{key}]", '{"Level": 30}')
+    server.handle(302, f"Push Guess[1] to Room[1] as {me}", "")
+    before = server._rooms[1].info()
+    server.close()
+    restarted = RoomServer(secret=SECRET, turn_timeout=None, room_rate=None, **paths)
+    assert restarted.Rooms == 1 and restarted._rooms[1].info() == before
+    status, summary, _ = restarted.handle(302, f"Push Guess[2] to Room[1] as {me}", "")
+    assert status.code == 1 and summary == "Turn 2 is played."
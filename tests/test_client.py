@@ -0,0 +1,119 @@
+"""BaseClient, AsyncConnection and ConnectionPool against a RoomServer in this process"""
+
+import asyncio
+
+import pytest
+
+from packs.game import BaseGame
+from packs.network.libnetutil import BaseClient, ConnectionPool
+from packs.network.server import RoomServer
+from packs.network.shard import HashRing, Shard
+
+from .conftest import SECRET
+
+
+@pytest.fixture
+def cluster(tmp_path, request):
+    """Two shard workers served in this process on local:// addresses"""
+    addresses = tuple(f"local://{request.node.name}-{index}" for index in range(2))
+    workers = [RoomServer(f"{request.node.name}-{index}", secret=SECRET, turn_timeout=None,
+                          room_rate=None, replay_path=str(tmp_path / "replays"),
+                          shard=Shard(index, HashRing(2), addresses))
+               for index in range(2)]
+    for worker in workers:
+        worker.start_local()
+    yield workers, addresses
+    for worker in workers:
+        worker.close()
+
+
+async def connect(url: str | ConnectionPool, username: str) -> BaseClient:
+    client = BaseClient(url if isinstance(url, ConnectionPool) else ConnectionPool(url))
+    await client.do_connect(username, "pw")
+    return client
+
+
+def test_pipelined_requests_share_one_connection():
+    async def main():
+        server = RoomServer(secret=SECRET, request_rate=None)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        pool = ConnectionPool(f"socket://127.0.0.1:{port}", size=1)
+        try:
+            clients = await asyncio.gather(*(connect(pool, f"pipe-{index}") for index in range(20)))
+            accounts = await asyncio.gather(*(client.do_get_info("account") for client in clients))
+            # Replies are matched to their requests by ID, whatever order they come back in
+            assert [account["Username"] for account in accounts] == [f"pipe-{index}" for index in range(20)]
+            assert pool.connections == 1
+        finally:
+            pool.close()
+            server.close()
+    asyncio.run(main())
+
+
+def test_room_round_trip():
+    async def main():
+        server = RoomServer(secret=SECRET, turn_timeout=None, room_rate=None)
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        pool = ConnectionPool(f"socket://127.0.0.1:{port}")
+        try:
+            owner, guest = await connect(pool, "ivan"), await connect(pool, "judy")
+            room = await owner.do_make_room(Level=1)
+            await guest.do_join_room(room["RoomID"])
+            assert (await owner.do_get_info("room"))["Players"] == ["ivan", "judy"]
+            assert (await owner.do_guess(0)).status.code == 2
+            assert (await guest.do_guess(0)).status.code == 1
+            assert (await owner.do_get_info("room"))["Turn"] == 1
+        finally:
+            pool.close()
+            server.close()
+    asyncio.run(main())
+
+
+def test_local_transport():
+    async def main():
+        server = RoomServer("local-test", secret=SECRET)
+        url = server.start_local()
+        client = await connect(url, "kim")
+        assert (await client.do_get_info("account"))["Username"] == "kim"
+        server.close()
+        with pytest.raises(ConnectionRefusedError):
+            await connect(url, "lee")
+    asyncio.run(main())
+
+
+def test_replay_follows_moved(cluster):
+    workers, addresses = cluster
+
+    async def main():
+        player = await connect(addresses[1], "grace")
+        room = await player.do_make_room(Level=1, Bots=1)
+        while player.room["Turn"] == 0 or player.room["Running"]:
+            await player.do_guess(sum(player.room["Bounds"]) // 2)
+        match = player.room["Match"]
+        host = next(worker for worker in workers if room["RoomID"] in worker._rooms)
+        assert match % 2 == host._shard.index
+        viewer = await connect(addresses[1 - host._shard.index], "heidi")
+        turns = []
+        header = await asyncio.wait_for(viewer.do_replay(match, turns.append), 5)
+        assert header["Match"] == match
+        await asyncio.sleep(0.05)
+        assert turns and turns[-1].status.code == 305
+    asyncio.run(main())
+
+
+def test_find_match_follows_moved(cluster):
+    workers, addresses = cluster
+    # A level whose queue lives on worker 1 while the clients talk to worker 0
+    level = next(level for level in BaseGame.level if workers[1]._shard.owns(f"queue:{level}"))
+
+    async def main():
+        clients = [await connect(addresses[0], name) for name in ("erin", "frank")]
+        rooms = await asyncio.wait_for(
+            asyncio.gather(*(client.do_find_match(level) for client in clients)), 5)
+        assert rooms[0]["RoomID"] == rooms[1]["RoomID"]
+        assert sorted(rooms[0]["Players"]) == ["erin", "frank"]
+        assert all(client._server.url == addresses[1] for client in clients)
+        await clients[0].do_guess(0)
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""Seeded games and the GameManager (packs.game)"""
+
+from packs.game.manager import GameManager
+from packs.game.room import RoomGame
+from packs.game.zeroplayer import ZeroPlayer
+
+
+def play(seed: int | None) -> tuple:
+    game = ZeroPlayer(3, 6, delay=0, stream=None)
+    game.set_seed(seed)
+    game.run()
+    return game.Seed, game._mystery, game._turn, [player.history() for player in game._players]
+
+
+def test_a_seed_reproduces_the_game():
+    assert play(11) == play(11)
+    assert play(11) != play(12)
+    assert play(None)[0] != play(None)[0]
+
+
+def test_games_do_not_share_a_generator():
+    first, second = RoomGame(10), RoomGame(10)
+    first.set_seed(1)
+    second.set_seed(1)
+    first.run()
+    RoomGame(10).run()
+    second.run()
+    assert first.Mystery == second.Mystery
+
+
+def test_manager_tracks_and_pools_games():
+    manager = GameManager(pool_size=1)
+    first = manager.create(RoomGame, 3)
+    second = manager.create(RoomGame, 4)
+    assert len(manager) == 2 and first.ID in manager and manager.get(second.ID) is second
+    manager.retire(first)
+    manager.retire(second.ID)
+    manager.retire(first)
+    assert len(manager) == 0 and manager.Pooled == 1
+    reused = manager.create(RoomGame, 5)
+    assert reused is first and reused.Level == 5 and reused.Players == () and manager.Pooled == 0
@@ -0,0 +1,116 @@
+"""Elo leaderboard on an order-statistics treap (packs.databases.leaderboard, RoomServer)"""
+
+import json
+from random import Random
+
+import pytest
+
+from packs.databases.game import GameDB
+from packs.databases.leaderboard import Leaderboard, RankTree
+from packs.network.libnetutil import StatusENUM
+from packs.network.server import RoomServer
+from packs.network.shard import HashRing, Shard
+from packs.utility import default_uid
+
+from .conftest import SECRET, encode, sign_in
+
+
+def test_rank_tree_agrees_with_a_sorted_list():
+    rng = Random(5)
+    tree, keys = RankTree(), []
+    for step in range(2000):
+        if keys and rng.random() < 0.3:
+            key = keys.pop(rng.randrange(len(keys)))
+            tree.remove(key)
+        else:
+            key = (rng.randrange(100), step)
+            tree.insert(key)
+            keys.append(key)
+    keys.sort()
+    assert len(tree) == len(keys)
+    assert [tree.select(index) for index in range(len(keys))] == keys
+    assert all(tree.rank(key) == index for index, key in enumerate(keys))
+    assert tree.rank((50, -1)) == sum(key < (50, -1) for key in keys)
+    assert list(tree.slice(-5, 10)) == keys[:10]
+    assert list(tree.slice(len(keys) - 3, len(keys) + 3)) == keys[-3:]
+    with pytest.raises(IndexError):
+        tree.select(len(keys))
+
+
+def test_top_rank_and_around():
+    leaderboard = Leaderboard(GameDB())
+    # u0 beats everyone, u1 everyone but u0, ...
+    players = [f"u{index}" for index in range(6)]
+    for histid, (high, low) in enumerate((high, low) for high in range(6) for low in range(high + 1, 6)):
+        leaderboard.record(histid, players[high], players[low], 1, {uid: uid.upper() for uid in players})
+    top = leaderboard.top(3)
+    assert [standing.uid for standing in top] == ["u0", "u1", "u2"]
+    assert [standing.rank for standing in top] == [1, 2, 3]
+    assert (top[0].name, top[0].wins, top[0].losses) == ("U0", 5, 0)
+    assert [leaderboard.rank(uid) for uid in players] == [1, 2, 3, 4, 5, 6]
+    assert [standing.uid for standing in leaderboard.around(4, 1)] == ["u2", "u3", "u4"]
+    assert [standing.uid for standing in leaderboard.around(1, 2)] == ["u0", "u1", "u2"]
+    assert leaderboard.at(6).uid == "u5" and leaderboard.rank("nobody") is None
+
+
+def test_draws_and_bots():
+    leaderboard = Leaderboard(GameDB())
+    leaderboard.record(1, "a", "b", 0)
+    assert leaderboard.rating("a") == leaderboard.rating("b") == 1000
+    leaderboard.record(2, "a", str(default_uid), 1)
+    assert str(default_uid) not in leaderboard and leaderboard.rating("a") > 1000
+
+
+@pytest.mark.parametrize("summary", ["Take Top[½] as {me}", "Take Rank of {me} with Around[½]"])
+def test_malformed_counts_are_syntax_errors(alice, summary):
+    server, me = alice
+    status = server.handle(301, summary.format(me=me), "")[0]
+    assert status.code == StatusENUM.REQ_SYNTAX_ERROR.value.code
+
+
+def play(server: RoomServer, keys: dict[str, str], winner: str, loser: str):
+    """A Level 1 match of winner against loser, who always guesses the lower bound"""
+    me = {name: f"self[{encode(name)}:{keys[name]}]" for name in (winner, loser)}
+    server.handle(302, f"Push room as Owner[{encode(winner)}:{keys[winner]}]", '{"Level": 1}')
+    room = next(iter(server._rooms.values()))
+    server.handle(302, f"Push {me[loser]} to Room[{room.rid}]", "")
+    while room.game is None or room.running:
+        guesses = {winner: sum(room.bounds) // 2, loser: room.bounds[0]} if room.game is not None else {}
+        for name in (winner, loser):
+            server.handle(302, f"Push Guess[{guesses.get(name, 0)}] to Room[{room.rid}] as {me[name]}", "")
+
+
+def test_shard_workers_agree():
+    addresses = ("local://w0", "local://w1")
+    workers = [RoomServer(secret=SECRET, turn_timeout=None, room_rate=None,
+                          shard=Shard(index, HashRing(2), addresses)) for index in range(2)]
+    names = ("erin", "frank", "grace")
+    keys = {name: sign_in(next(worker for worker in workers if worker._shard.owns(f"user:{name}")), name)
+            for name in names}
+    # Each worker records one match; both then rank the matches of the other too
+    play(workers[0], keys, "erin", "frank")
+    play(workers[1], keys, "grace", "erin")
+    tops = [worker.handle(301, f"Take Top[100] as self[{encode('erin')}:{keys['erin']}]", "")
+            for worker in workers]
+    assert tops[0][0].code == StatusENUM.GOOD.value.code and tops[0] == tops[1]
+    assert set(names) <= {standing["Username"] for standing in json.loads(tops[0][2])}
+    # Only one of them checkpoints the board
+    assert [worker._keeps_standings for worker in workers].count(True) == 1
+    for worker in workers:
+        worker.close()
+
+
+def test_co_winners_draw():
+    server = RoomServer(secret=SECRET, turn_timeout=None, room_rate=None)
+    keys = {name: sign_in(server, name) for name in ("carol", "dave")}
+    me = {name: f"self[{encode(name)}:{key}]" for name, key in keys.items()}
+    server.handle(302, f"Push room as Owner[{encode('carol')}:{keys['carol']}]", '{"Level": 1}')
+    room = next(iter(server._rooms.values()))
+    server.handle(302, f"Push {me['dave']} to Room[{room.rid}]", "")
+    while room.game is None or room.running:
+        guess = sum(room.bounds) // 2 if room.game is not None else 0
+        for name in ("carol", "dave"):
+            server.handle(302, f"Push Guess[{guess}] to Room[{room.rid}] as {me[name]}", "")
+    standings = {standing.name: standing for standing in server._leaderboard.top(100)}
+    assert (standings["carol"].wins, standings["carol"].losses) == (0, 0)
+    assert (standings["dave"].wins, standings["dave"].losses) == (0, 0)
@@ -0,0 +1,28 @@
+"""Load generator (packs.network.loadgen)"""
+
+import asyncio
+
+from packs.network import loadgen
+from packs.network.server import RoomServer
+
+
+def test_report_percentiles():
+    recorder = loadgen.Recorder()
+    recorder._samples["guess"] = [index / 1000 for index in range(100, 0, -1)]
+    report = recorder.report(elapsed=2)
+    assert report["guess"]["count"] == 100 and report["guess"]["rps"] == 50
+    assert (report["guess"]["p50"], report["guess"]["p95"], report["guess"]["p99"]) == (51, 96, 100)
+    assert report["total"] == {"count": 100, "rps": 50}
+
+
+def test_simulated_players_finish_their_games():
+    server = RoomServer("loadgen-test", turn_timeout=None, request_rate=None, room_rate=None)
+    url = server.start_local()
+    try:
+        report = asyncio.run(loadgen.run(url, players=4, room_size=2, level=1, bots=1, games=2, pool_size=2))
+    finally:
+        server.close()
+    assert report["connect"]["count"] == report["logout"]["count"] == 4
+    assert report["make_room"]["count"] == 2
+    assert report["guess"]["count"] == report["get_room"]["count"] >= 2 * 2 * 2
+    assert server.Rooms == 0
@@ -0,0 +1,58 @@
+"""Skill-bucketed matchmaking (packs.network.matchmaking, RoomServer)"""
+
+from packs.network import matchmaking
+from packs.network.libnetutil import StatusENUM
+from packs.network.matchmaking import MatchQueue, Ticket
+
+
+def test_pairs_the_closest_ratings():
+    queue = MatchQueue(2, window=100)
+    assert queue.add(Ticket("a", 2, 1000)) is None
+    assert queue.add(Ticket("b", 2, 1500)) is None
+    group = queue.add(Ticket("c", 2, 1040))
+    assert [ticket.key for ticket in group] == ["a", "c"]
+    assert len(queue) == 1 and "b" in queue
+
+
+def test_levels_are_never_mixed():
+    queue = MatchQueue(2)
+    assert queue.add(Ticket("a", 2, 1000)) is None
+    assert queue.add(Ticket("b", 3, 1000)) is None
+    assert [ticket.key for ticket in queue.add(Ticket("c", 3, 1010))] == ["b", "c"]
+
+
+def test_groups_of_room_size_lowest_rating_first():
+    groups = []
+    queue = MatchQueue(3, window=100, on_match=groups.append)
+    for key, rating in (("a", 1050), ("b", 1000), ("c", 1020)):
+        queue.add(Ticket(key, 2, rating))
+    assert [[ticket.key for ticket in group] for group in groups] == [["b", "c", "a"]]
+
+
+def test_window_widens_while_waiting(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(matchmaking, "monotonic", lambda: clock[0])
+    queue = MatchQueue(2, window=100, widen=50, max_window=400)
+    queue.add(Ticket("a", 2, 1000))
+    assert queue.add(Ticket("b", 2, 1300)) is None
+    clock[0] = 3
+    assert queue.poll() == []
+    clock[0] = 4
+    (group,) = queue.poll()
+    assert [ticket.key for ticket in group] == ["a", "b"] and len(queue) == 0
+    assert queue.window(group[0], now=100) == 400
+
+
+def test_requeue_replaces_and_discard_removes():
+    queue = MatchQueue(2, window=10)
+    queue.add(Ticket("a", 2, 1000))
+    queue.add(Ticket("a", 2, 2000))
+    assert len(queue) == 1
+    assert queue.discard("a").rating == 2000 and queue.discard("a") is None
+    assert queue.add(Ticket("b", 2, 1000)) is None
+
+
+def test_malformed_level_is_a_syntax_error(alice):
+    server, me = alice
+    status = server.handle(302, f"Push {me} to Queue[½]", "")[0]
+    assert status.code == StatusENUM.REQ_SYNTAX_ERROR.value.code
@@ -0,0 +1,44 @@
+"""Player history (packs.players)"""
+
+from array import array
+
+import pytest
+
+from packs.players import Guesses
+from packs.players.bot import Bot
+from packs.players.remote import RemotePlayer
+
+
+def test_guesses_are_packed_until_a_value_does_not_fit():
+    guesses = Guesses([1, -2, 3])
+    assert isinstance(guesses._items, array) and guesses._items.itemsize == 8
+    guesses.append(2 ** 90)
+    guesses.append(None)
+    assert list(guesses) == [1, -2, 3, 2 ** 90, None] and len(guesses) == 5
+    assert guesses[3] == 2 ** 90 and guesses.last() is None
+
+
+def test_players_have_no_instance_dict():
+    for player in (Bot("bot", 2), RemotePlayer("alice", "uid")):
+        with pytest.raises(AttributeError):
+            player.anything = 1
+
+
+def test_guesses_view_is_live_and_read_only():
+    player = RemotePlayer("alice", "uid")
+    view = player.guesses
+    assert len(view) == 0 and view.last() is None and player.last() is None
+    for value in (4, 8):
+        player.submit(value)
+        player.get()
+    assert list(view) == [4, 8] and view[-1] == view.last() == player.last() == 8
+    assert 4 in view and player.history() == (4, 8)
+    with pytest.raises(TypeError):
+        view[0] = 1
+
+
+def test_bot_view_follows_its_own_guesses():
+    bot = Bot("bot", 2)
+    view = bot.guesses
+    guess = bot.get()
+    assert list(view) == [guess] and bot.last() == guess == bot.history()[-1]
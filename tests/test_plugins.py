@@ -0,0 +1,36 @@
+"""Plugin discovery (packs.plugins)"""
+
+import sys
+
+from packs.players.bot import Bot
+from packs.plugins import PluginIndex
+
+PLUGIN = '''
+from packs.players.bot import Bot
+STRATEGIES = {"cautious": {"explore": 0.1}, "greedy": "Greedy"}
+class Greedy(Bot):
+    pass
+'''
+
+
+def test_discovery_is_cached_and_lazy(tmp_path):
+    (tmp_path / "zz_tests_greedy.py").write_text(PLUGIN)
+    index = PluginIndex(str(tmp_path))
+    assert index.strategies() == ["cautious", "greedy"]
+    assert index.strategy("cautious") == (Bot, {"explore": 0.1})
+    assert "gtrnv2_plugin_zz_tests_greedy" not in sys.modules
+    cls, _ = index.strategy("greedy")
+    assert issubclass(cls, Bot) and "gtrnv2_plugin_zz_tests_greedy" in sys.modules
+    assert (tmp_path / ".index.json").exists()
+    assert PluginIndex(str(tmp_path)).Plugins == index.Plugins
+
+
+def test_malformed_plugins_are_skipped(tmp_path):
+    (tmp_path / "a.py").write_text("STRATEGIES = {[]: 1}\n")
+    (tmp_path / "b.py").write_text("STRATEGIES = {'x': {'explore': b'a'}}\n")
+    (tmp_path / "c.py").write_text("VARIANTS = {1: 'Game'}\n")
+    (tmp_path / "d.py").write_text("STRATEGIES = {\n")
+    (tmp_path / "e.py").write_text("STRATEGIES = {'fine': {'bias': 0.25}}\n")
+    index = PluginIndex(str(tmp_path))
+    assert index.strategies() == ["fine"]
+    assert all(index.Plugins[f"{name}.py"]["Error"] for name in "abcd")
@@ -0,0 +1,48 @@
+"""Frame codec and command parsing (packs.network.libnetutil)"""
+
+import pytest
+
+from packs.network.libnetutil import FrameDecoder, FrameError, StatusENUM, encode_frame, parse_command
+
+
+def test_frame_round_trip():
+    decoder = FrameDecoder(size=16)
+    decoder.feed(encode_frame(302, "Push Guess[5]", "body ✓", rid=7))
+    (frame,) = decoder.frames()
+    assert (frame.rid, frame.code, frame.text()) == (7, 302, ("Push Guess[5]", "body ✓"))
+
+
+def test_frames_split_across_reads():
+    data = b''.join(encode_frame(301, f"Take Top[{index}]", rid=index) for index in range(50))
+    decoder = FrameDecoder(size=8)
+    received = []
+    for start in range(0, len(data), 5):
+        decoder.feed(data[start:start + 5])
+        received.extend((frame.rid, frame.text()[0]) for frame in decoder.frames())
+    assert received == [(index, f"Take Top[{index}]") for index in range(50)]
+    assert len(decoder) == 0
+
+
+def test_oversized_frame_is_refused():
+    decoder = FrameDecoder(limit=8)
+    decoder.feed(encode_frame(1, "summary", "longer than the limit"))
+    with pytest.raises(FrameError):
+        list(decoder.frames())
+
+
+def test_parse_command():
+    verb, target, fields = parse_command("Push Guess[-5] to Room[12] as self[YWxpY2U=:key] since Version[3]")
+    assert (verb, target) == ("push", "")
+    assert fields == {"guess": "-5", "room": "12", "self": ("YWxpY2U=", "key"), "version": "3"}
+
+
+def test_parse_command_verb_and_target():
+    verb, target, fields = parse_command("Take data of Room[1] and self[a:b]")
+    assert (verb, target, fields["room"]) == ("take", "data", "1")
+    assert parse_command("Disconnect").verb == "disconnect"
+
+
+def test_status_lookup_by_code():
+    assert StatusENUM.get(202) is StatusENUM.OVERFLOW.value
+    assert StatusENUM.getstr(8) == StatusENUM.MOVED.value.description
+    assert StatusENUM.get(999) is StatusENUM.NULL.value
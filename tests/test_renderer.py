@@ -0,0 +1,80 @@
+"""Diffing terminal renderer (packs.game.renderer)"""
+
+import io
+
+from packs.game import checkpoint, singleplayer
+from packs.game.renderer import Renderer
+from packs.game.singleplayer import SinglePlayer
+from packs.game.zeroplayer import ZeroPlayer
+from packs.players.bot import Bot
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def test_plain_stream_gets_only_changed_lines():
+    stream = io.StringIO()
+    renderer = Renderer(stream, fps=None)
+    renderer.frame(["Turn 1", "a: 5", "b: 7"])
+    renderer.frame(["Turn 2", "a: 5", "b: 3"])
+    renderer.frame(["Turn 2", "a: 5", "b: 3"])
+    assert stream.getvalue() == "Turn 1\na: 5\nb: 7\nTurn 2\nb: 3\n"
+
+
+def test_terminal_rewrites_only_from_the_first_change():
+    stream = Terminal()
+    renderer = Renderer(stream, fps=None)
+    renderer.frame(["Turn 1", "a: 5", "b: 7"])
+    assert stream.getvalue() == "\r\033[2KTurn 1\n\r\033[2Ka: 5\n\r\033[2Kb: 7\n"
+    stream.seek(0)
+    stream.truncate()
+    renderer.frame(["Turn 1", "a: 5", "b: 3"])
+    # Up one line, rewrite it
+    assert stream.getvalue() == "\033[1A\r\033[2Kb: 3\n"
+    stream.seek(0)
+    stream.truncate()
+    renderer.frame(["Turn 2", "a: 5"])
+    # Up three lines, rewrite the first, keep the second, clear the third and back up over it
+    assert stream.getvalue() == "\033[3A\r\033[2KTurn 2\n\n\r\033[2K\n\033[1A"
+
+
+def test_lines_written_below_are_redrawn():
+    stream = Terminal()
+    renderer = Renderer(stream, fps=None)
+    renderer.frame(["Turn 1"])
+    renderer.skip()
+    stream.seek(0)
+    stream.truncate()
+    renderer.frame(["Turn 1"])
+    assert stream.getvalue() == "\033[1A\r\033[2K\n\033[1A"
+
+
+def test_frames_over_the_cap_are_held_back():
+    stream = io.StringIO()
+    renderer = Renderer(stream, fps=0.001)
+    assert renderer.frame(["Turn 1"]) is True
+    assert renderer.frame(["Turn 2"]) is False
+    assert renderer.frame(["Turn 3"]) is False
+    assert stream.getvalue() == "Turn 1\n"
+    renderer.close()
+    assert stream.getvalue() == "Turn 1\nTurn 3\n"
+
+
+def test_restored_zeroplayer_draws_on_its_stream():
+    game = ZeroPlayer(3, 4, delay=0, stream=None)
+    stream = io.StringIO()
+    restored = checkpoint.load(checkpoint.dump(game), stream=stream, delay=0)
+    restored.run()
+    assert stream.getvalue().startswith("Mystery Number:")
+    assert "Game ends in" in stream.getvalue()
+
+
+def test_singleplayer_writes_only_to_its_stream(monkeypatch, capsys):
+    monkeypatch.setattr(singleplayer, "sleep", lambda seconds: None)
+    stream = io.StringIO()
+    SinglePlayer(Bot("Bot-0", 1), Bot("Bot-1", 1), level=1, stream=stream).run()
+    assert stream.getvalue().startswith("[GTRNv2] LEVEL 1!")
+    assert "Game ends in" in stream.getvalue()
+    assert capsys.readouterr().out == ""
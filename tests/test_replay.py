@@ -0,0 +1,55 @@
+"""Match records and replays (packs.databases.replay, RoomServer)"""
+
+import asyncio
+import json
+
+import pytest
+
+from packs.databases.replay import ReplayStore
+from packs.network.libnetutil import BaseClient, ConnectionPool, StatusENUM
+from packs.network.server import RoomServer
+
+from .conftest import SECRET
+
+
+def test_store_appends_and_reads_back(tmp_path):
+    store = ReplayStore(str(tmp_path))
+    store.begin(7, {"Level": 1})
+    store.turn(7, {"Turn": 1})
+    store.end(7, {"Winners": ["a"]})
+    assert 7 in store and 8 not in store
+    with store.open(7) as file:
+        lines = [json.loads(line) for line in file]
+    assert lines == [{"Level": 1, "Match": 7}, {"Turn": 1}, {"End": True, "Winners": ["a"]}]
+
+
+def test_finished_match_is_replayed(tmp_path):
+    async def main():
+        server = RoomServer(secret=SECRET, turn_timeout=None, room_rate=None, replay_path=str(tmp_path))
+        client = BaseClient(ConnectionPool(server.start_local("replay-test")))
+        await client.do_connect("olga", "pw")
+        await client.do_make_room(Level=1, Bots=1)
+        while client.room["Turn"] == 0 or client.room["Running"]:
+            await client.do_guess(sum(client.room["Bounds"]) // 2)
+        frames = []
+        header = await client.do_replay(client.room["Match"], frames.append)
+        await asyncio.sleep(0.05)
+        server.close()
+        assert header["Match"] == client.room["Match"] and header["Players"] == ["olga", "Bot-0"]
+        assert [frame.status.code for frame in frames] == [304, 305]
+        turns = json.loads(frames[0].body)
+        assert len(turns) == client.room["Turn"] + 1 and turns[-1]["End"] is True
+    asyncio.run(main())
+
+
+def test_malformed_match_is_a_syntax_error(alice):
+    server, me = alice
+    status = server.handle(304, f"Replay Match[½] to {me} at Speed[1]", "")[0]
+    assert status.code == StatusENUM.REQ_SYNTAX_ERROR.value.code
+
+
+@pytest.mark.parametrize("speed", ["nan", "inf", "-inf", "1e999", "fast"])
+def test_speed_must_be_a_finite_number(alice, speed):
+    server, me = alice
+    status = server.handle(304, f"Replay Match[1] to {me} at Speed[{speed}]", "")[0]
+    assert status.code == StatusENUM.REQ_SYNTAX_ERROR.value.code
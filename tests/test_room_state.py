@@ -0,0 +1,56 @@
+"""Versioned room state: `since Version[N]` deltas (RoomServer)"""
+
+import json
+
+from packs.network import server as server_module
+
+from .conftest import SECRET, encode, sign_in
+
+
+def room_data(server, me: str, since: str = "") -> dict:
+    return json.loads(server.handle(301, f"Take data of Room[1] and {me}{since}", "")[2])
+
+
+def apply(state: dict, delta: dict) -> dict:
+    state = dict(state)
+    for change in delta["Changes"]:
+        state.update(change)
+    state["Version"] = delta["Version"]
+    return state
+
+
+def two_players():
+    server = server_module.RoomServer(secret=SECRET, turn_timeout=None, room_rate=None)
+    keys = {name: sign_in(server, name) for name in ("mia", "ned")}
+    me = {name: f"self[{encode(name)}:{key}]" for name, key in keys.items()}
+    server.handle(302, f"Push room as Owner[{encode('mia')}:{keys['mia']}]", '{"Level": 20}')
+    return server, me
+
+
+def test_delta_matches_the_full_state():
+    server, me = two_players()
+    before = room_data(server, me["mia"])
+    server.handle(302, f"Push {me['ned']} to Room[1]", "")
+    for guess in (1, 2, 3):
+        for name in me:
+            server.handle(302, f"Push Guess[{guess}] to Room[1] as {me[name]}", "")
+    delta = room_data(server, me["mia"], f" since Version[{before['Version']}]")
+    assert delta["Since"] == before["Version"] and len(delta["Changes"]) > 1
+    assert apply(before, delta) == room_data(server, me["mia"])
+
+
+def test_current_version_has_no_changes():
+    server, me = two_players()
+    version = room_data(server, me["mia"])["Version"]
+    assert room_data(server, me["mia"], f" since Version[{version}]")["Changes"] == []
+
+
+def test_versions_not_covered_get_the_full_state():
+    server, me = two_players()
+    server.handle(302, f"Push {me['ned']} to Room[1]", "")
+    room = server._rooms[1]
+    for _ in range(server_module.ROOM_CHANGES + 1):
+        room.changed("Bounds")
+    full = room_data(server, me["mia"])
+    for since in ("0", "-1", "½", str(room.version + 1)):
+        assert room_data(server, me["mia"], f" since Version[{since}]") == full
@@ -0,0 +1,62 @@
+"""Turn deadlines and the missing-guess policy (packs.game.scheduler, packs.game.room)"""
+
+import asyncio
+
+from packs.game.room import RoomGame
+from packs.game.scheduler import TurnScheduler
+from packs.players.remote import RemotePlayer
+
+
+def room(players: int = 2) -> RoomGame:
+    game = RoomGame(30)
+    for index in range(players):
+        game.register_player(RemotePlayer(f"p{index}", f"uid-{index}"))
+    game.set_seed(3)
+    game.run()
+    return game
+
+
+def test_last_guess_closes_the_turn():
+    played = []
+    scheduler = TurnScheduler(None, on_turn=lambda key, game, verdicts: played.append((key, len(verdicts))))
+    game = room()
+    game.Players[0].submit(1)
+    assert scheduler.submitted("room", game) is None and played == []
+    game.Players[1].submit(2)
+    assert len(scheduler.submitted("room", game)) == 2
+    assert played == [("room", 2)] and game.Turn == 1
+
+
+def play_past_deadline(missing: str, first: int = 5) -> tuple[RoomGame, list]:
+    """First turn: everyone guesses. Second turn: p1 misses the deadline."""
+    played = []
+
+    async def main():
+        scheduler = TurnScheduler(0.01, missing, on_turn=lambda key, game, verdicts: played.append(verdicts))
+        game.Players[0].submit(first)
+        game.Players[1].submit(first)
+        scheduler.submitted("room", game)
+        game.Players[0].submit(first + 1)
+        assert scheduler.submitted("room", game) is None
+        assert "room" in scheduler and scheduler.deadline("room") is not None
+        await asyncio.sleep(0.05)
+        assert "room" not in scheduler
+    game = room()
+    asyncio.run(main())
+    return game, played
+
+
+def test_deadline_skips_missing_players():
+    game, played = play_past_deadline("skip")
+    assert [verdict.player.name for verdict in played[1]] == ["p0"]
+    assert game.Players[1].history() == (5,)
+
+
+def test_deadline_repeats_missing_guesses():
+    game, played = play_past_deadline("repeat")
+    assert [(verdict.player.name, verdict.value) for verdict in played[1]] == [("p0", 6), ("p1", 5)]
+
+
+def test_deadline_forfeits_missing_players():
+    game, played = play_past_deadline("forfeit")
+    assert [player.name for player in game.Players] == ["p0"]
@@ -0,0 +1,112 @@
+"""RoomServer request handling"""
+
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from packs.databases.game import GameDB
+from packs.game.room import RoomGame
+from packs.network.libnetutil import BaseClient, StatusENUM
+from packs.network.server import Room, RoomServer
+
+from .conftest import SECRET, encode, sign_in
+
+SYNTAX_ERROR = StatusENUM.REQ_SYNTAX_ERROR.value.code
+
+
+@pytest.mark.parametrize("summary", [
+    "Push Guess[--5] to Room[1] as {me}",
+    "Push Guess[½] to Room[1] as {me}",
+    "Take data of Room[½] and {me}",
+    "Take data of Room[²] and {me}",
+])
+def test_malformed_integers_are_syntax_errors(alice, summary):
+    server, me = alice
+    assert server.handle(302, summary.format(me=me), "")[0].code == SYNTAX_ERROR
+
+
+def test_negative_guess_is_played(alice):
+    server, me = alice
+    assert server.handle(302, f"Push Guess[-5] to Room[1] as {me}", "")[0].code in (1, 2)
+
+
+def test_unexpected_errors_become_error_replies(alice, capsys):
+    server, me = alice
+
+    def broken(fields):
+        raise KeyError("boom")
+    server.do_get_account = broken
+    status, _, _ = server.handle(301, f"Take data of {me}", "")
+    assert status.code == StatusENUM.INTERNAL_SERVER_ERROR.value.code
+    # Logged, but without the summary and its session key
+    assert me.split(':')[1].rstrip(']') not in capsys.readouterr().out
+
+
+def play_to_the_end(level: int, tmp_path) -> tuple[RoomServer, Room, list[int]]:
+    """alice alone in Room[1] of a server recording replays and checkpoints, bisecting until she wins"""
+    server = RoomServer(secret=SECRET, turn_timeout=None, room_rate=None,
+                        replay_path=str(tmp_path / "replays"), checkpoint_path=str(tmp_path / "checkpoints"))
+    key = sign_in(server, "alice")
+    me = f"self[{encode('alice')}:{key}]"
+    server.handle(302, f"Push room as Owner[{encode('alice')}:{key}]", json.dumps({"Level": level}))
+    room = server._rooms[1]
+    statuses = [server.handle(302, f"Push Guess[0] to Room[1] as {me}", "")[0].code]
+    while room.running:
+        statuses.append(server.handle(302, f"Push Guess[{sum(room.bounds) // 2}] to Room[1] as {me}", "")[0].code)
+    return server, room, statuses
+
+
+def test_mysteries_beyond_64_bits_are_recorded(tmp_path, monkeypatch):
+    run = RoomGame.run
+
+    def big_mystery(game):
+        run(game)
+        game._mystery = 2 ** 70 + 3
+    monkeypatch.setattr(RoomGame, "run", big_mystery)
+    server, room, statuses = play_to_the_end(70, tmp_path)
+    assert set(statuses) == {StatusENUM.GOOD.value.code}
+    assert server._database.get_history_data(room.match).mystery == 2 ** 70 + 3
+    assert room.match not in server._live
+    assert not os.listdir(tmp_path / "checkpoints")
+
+
+def test_match_ends_even_when_it_cannot_be_recorded(tmp_path, monkeypatch):
+    def broken(*args):
+        raise OverflowError("too large")
+    monkeypatch.setattr(GameDB(), "add_history", broken)
+    server, room, statuses = play_to_the_end(3, tmp_path)
+    assert statuses[-1] == StatusENUM.INTERNAL_SERVER_ERROR.value.code
+    assert room.match not in server._live and not os.listdir(tmp_path / "checkpoints")
+    with open(tmp_path / "replays" / f"{room.match}.jsonl") as file:
+        assert json.loads(file.readlines()[-1])["End"] is True
+
+
+def test_passwords_are_hashed_off_the_event_loop(monkeypatch):
+    hash_password = RoomServer._hash
+
+    def slow_hash(password, salt):
+        time.sleep(0.3)
+        return hash_password(password, salt)
+
+    async def main():
+        server = RoomServer("hashing", secret=SECRET)
+        url = server.start_local()
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            alice = BaseClient(url)
+            await alice.do_connect("alice", "pw")
+            monkeypatch.setattr(RoomServer, "_hash", staticmethod(slow_hash))
+            for other in (url, f"socket://127.0.0.1:{port}"):
+                connecting = asyncio.ensure_future(BaseClient(other).do_connect("bob", "pw"))
+                await asyncio.sleep(0.05)
+                # Served while bob's password is being hashed
+                account = await asyncio.wait_for(alice.do_get_info("account"), 0.2)
+                assert account["Username"] == "alice" and not connecting.done()
+                await connecting
+        finally:
+            server.close()
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""Session store and signed session keys (packs.network.sessions, RoomServer)"""
+
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from packs.databases.game import GameDB
+from packs.network.libnetutil import StatusENUM
+from packs.network.server import RoomServer
+from packs.network.sessions import Session, SessionStore
+from packs.network.shard import HashRing, Shard, cluster_secret, worker_paths
+
+from .conftest import SECRET, encode, sign_in
+
+
+def whoami(server: RoomServer, username: str, key: str):
+    return server.handle(301, f"Take data of self[{encode(username)}:{key}]", "")[0].code
+
+
+def test_store_revoke_and_snapshot(tmp_path):
+    store = SessionStore()
+    store.add(Session("alice", "uid", "key-a"))
+    store.add(Session("bob", "uid", "key-b"))
+    store.revoke("key-a", time.time() + 60)
+    assert store.get("key-a") is None and store.revoked("key-a")
+    store.save(str(tmp_path / "sessions.json"))
+    restored = SessionStore()
+    assert restored.load(str(tmp_path / "sessions.json")) == 1
+    assert restored.get("key-b").username == "bob"
+    assert restored.revoked("key-a") and not restored.revoked("key-b")
+
+
+def test_revocation_lapses_with_the_key():
+    store = SessionStore()
+    store.revoke("key", time.time() - 1)
+    assert not store.revoked("key")
+
+
+def test_key_verifies():
+    server = RoomServer(secret=SECRET)
+    key = sign_in(server, "alice")
+    assert whoami(server, "alice", key) == StatusENUM.GOOD.value.code
+    assert whoami(server, "bob", key) == StatusENUM.BLOCKED.value.code
+
+
+def test_logged_out_key_is_not_adopted_again():
+    server = RoomServer(secret=SECRET)
+    key = sign_in(server, "alice")
+    server.handle(303, f"Disconnect self[{encode('alice')}:{key}]", "")
+    assert whoami(server, "alice", key) == StatusENUM.BLOCKED.value.code
+
+
+def test_deleted_account_key_is_refused():
+    server = RoomServer(secret=SECRET)
+    key = sign_in(server, "alice")
+    server.handle(303, f"Delete Data as AN[{encode('alice')}:{key}]", "")
+    assert whoami(server, "alice", key) == StatusENUM.BLOCKED.value.code
+
+
+def test_key_expires_after_its_lifetime():
+    server = RoomServer(secret=SECRET, session_lifetime=-1)
+    key = sign_in(server, "alice")
+    assert whoami(server, "alice", key) == StatusENUM.BLOCKED.value.code
+
+
+def test_sibling_adopts_only_genuine_keys():
+    ring = HashRing(2)
+    addresses = ("local://w0", "local://w1")
+    workers = [RoomServer(secret=SECRET, shard=Shard(index, ring, addresses)) for index in range(2)]
+    owner = next(worker for worker in workers if worker._shard.owns("user:alice"))
+    sibling = next(worker for worker in workers if worker is not owner)
+    key = sign_in(owner, "alice")
+    assert whoami(sibling, "alice", key) == StatusENUM.GOOD.value.code
+    raw = bytearray(urlsafe_b64decode(key))
+    raw[-1] ^= 1
+    assert whoami(sibling, "alice", urlsafe_b64encode(bytes(raw)).decode()) == StatusENUM.BLOCKED.value.code
+    stranger = RoomServer(secret=b"x" * 32, shard=sibling._shard)
+    assert whoami(stranger, "alice", key) == StatusENUM.BLOCKED.value.code
+
+
+def test_cluster_secret_is_kept_with_the_sessions(tmp_path):
+    path = str(tmp_path / "sessions.json")
+    assert cluster_secret(path) == cluster_secret(path) != cluster_secret(None)
+    assert worker_paths(1, session_path=path)["session_path"] == str(tmp_path / "sessions-worker-1.json")
+
+
+def test_store_expires_idle_sessions():
+    expired = []
+    store = SessionStore(ttl=0.01, on_expire=expired.append)
+    store.add(Session("alice", "uid", "key"))
+    time.sleep(0.02)
+    assert store.get("key") is None and [session.username for session in expired] == ["alice"]
+
+
+def test_store_evicts_the_least_recently_used():
+    store = SessionStore(capacity=2)
+    for name in ("a", "b"):
+        store.add(Session(name, "uid", f"key-{name}"))
+    store.get("key-a")
+    store.add(Session("c", "uid", "key-c"))
+    assert [session.username for session in store] == ["a", "c"]
+
+
+def test_idle_expired_key_is_refused():
+    server = RoomServer(secret=SECRET, session_ttl=0.01)
+    key = sign_in(server, "alice")
+    time.sleep(0.02)
+    assert whoami(server, "alice", key) == StatusENUM.BLOCKED.value.code
+
+
+def test_accounts_survive_a_restart():
+    # Kept in the GameDB: no session file needed
+    server = RoomServer(secret=SECRET)
+    key = sign_in(server, "alice")
+    server.close()
+    server = RoomServer(secret=SECRET)
+    status, _, _ = server.handle(302, f"Connect with AN[{encode('alice')}] and AP[{encode('pw')}]", "")
+    assert status.code == StatusENUM.CONNECT_SUCCESS.value.code
+    status, _, _ = server.handle(302, f"Push Data as AN[{encode('alice')}] and AP[{encode('pw')}] then Connect", "")
+    assert status.code == StatusENUM.ALREADY_EXISTS.value.code
+    assert [user.username for user in GameDB().get_users()].count("alice") == 1
+    status, _, _ = server.handle(303, f"Delete Data as AN[{encode('alice')}:{key}]", "")
+    assert status.code == StatusENUM.DELETED.value.code
+    assert not RoomServer(secret=SECRET)._known("alice")
+
+
+def test_sessions_without_accounts_are_dropped(tmp_path):
+    path = tmp_path / "sessions.json"
+    server = RoomServer(secret=SECRET, session_path=str(path))
+    key = sign_in(server, "alice")
+    server.close()
+    GameDB().reset()
+    server = RoomServer(secret=SECRET, session_path=str(path))
+    assert server.Sessions == 0
+    status, _, _ = server.handle(303, f"Delete Data as AN[{encode('alice')}:{key}]", "")
+    assert status.code == StatusENUM.BLOCKED.value.code
@@ -0,0 +1,65 @@
+"""Load shedding: token buckets and OVERFLOW (packs.network.throttle, RoomServer)"""
+
+from packs.network import throttle
+from packs.network.libnetutil import FrameDecoder, StatusENUM, encode_frame
+from packs.network.server import RoomServer, _Connection
+
+from .conftest import SECRET, encode, sign_in
+
+
+def test_bucket_allows_bursts_and_refills(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(throttle, "monotonic", lambda: clock[0])
+    bucket = throttle.TokenBucket(2, burst=3)
+    assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+    clock[0] += 0.5
+    assert bucket.take() and not bucket.take()
+    clock[0] += 60
+    assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+
+
+def test_busy_room_is_answered_with_overflow():
+    server = RoomServer(secret=SECRET, room_rate=1)
+    key = sign_in(server, "alice")
+    server.handle(302, f"Push room as Owner[{encode('alice')}:{key}]", "")
+    me = f"self[{encode('alice')}:{key}]"
+    codes = [server.handle(301, f"Take data of Room[1] and {me}", "")[0].code for _ in range(3)]
+    assert codes == [1, 1, StatusENUM.OVERFLOW.value.code]
+    # Leaving is not throttled
+    assert server.handle(303, f"Disconnect {me} from Room[1]", "")[0].code == StatusENUM.DELETED.value.code
+
+
+class Transport:
+    def __init__(self, queued: int):
+        self.queued = queued
+        self.written = b''
+
+    def get_write_buffer_size(self):
+        return self.queued
+
+    def write(self, data: bytes):
+        self.written += data
+
+
+def replies(connection, transport: Transport, *summaries: str) -> list[int]:
+    data = b''.join(encode_frame(301, summary, rid=index + 1) for index, summary in enumerate(summaries))
+    buffer = connection.get_buffer(len(data))
+    buffer[:len(data)] = data
+    connection.buffer_updated(len(data))
+    decoder = FrameDecoder()
+    decoder.feed(transport.written)
+    return [frame.code for frame in decoder.frames()]
+
+
+def test_flooding_connection_is_shed():
+    server = RoomServer(secret=SECRET, request_rate=1)
+    connection, transport = _Connection(server), Transport(0)
+    connection.connection_made(transport)
+    assert replies(connection, transport, *["Take Top[1]"] * 3)[-1] == StatusENUM.OVERFLOW.value.code
+
+
+def test_client_not_reading_its_replies_is_shed():
+    server = RoomServer(secret=SECRET, send_queue=16)
+    connection, transport = _Connection(server), Transport(17)
+    connection.connection_made(transport)
+    assert replies(connection, transport, "Take Top[1]") == [StatusENUM.OVERFLOW.value.code]
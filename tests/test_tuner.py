@@ -0,0 +1,32 @@
+"""Bot strategy tuner (packs.tuner)"""
+
+import json
+
+from packs import tuner
+
+
+def test_candidates_start_with_the_baseline():
+    strategies = tuner.candidates(5, seed=2)
+    assert strategies[0] == tuner.BASELINE and len(strategies) == 5
+    assert strategies == tuner.candidates(5, seed=2)
+    assert all(0 <= strategy["explore"] <= 1 and 0 <= strategy["bias"] <= 1 for strategy in strategies)
+
+
+def test_evaluation_is_seeded():
+    strategy = {"explore": 0.0, "bias": 0.5}
+    wins, turns = tuner.evaluate(strategy, 3, 1, 20, seed=4)
+    assert (wins, turns) == tuner.evaluate(strategy, 3, 1, 20, seed=4)
+    assert 0 <= wins <= 20 and turns >= 20
+
+
+def test_successive_halving(tmp_path):
+    path = str(tmp_path / "tune.json")
+    report = tuner.tune(2, tuner.candidates(4, seed=0), 4, seed=0, workers=1, path=path)
+    assert [len(round_["Results"]) for round_ in report["Rounds"]] == [4, 2, 1]
+    assert [round_["Games"] for round_ in report["Rounds"]] == [4, 8, 16]
+    # Survivors of a round are the best of the one before
+    best_two = report["Rounds"][0]["Results"][:2]
+    assert {(result["explore"], result["bias"]) for result in report["Rounds"][1]["Results"]} == \
+        {(result["explore"], result["bias"]) for result in best_two}
+    with open(path) as file:
+        assert json.load(file) == report